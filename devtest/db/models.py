@@ -375,6 +375,17 @@ class TestBed(BaseModel):
         """Return list of defined TestBed names."""
         return [t[0] for t in cls.select(cls.name).tuples()]
 
+    @classmethod
+    def select_with_equipment(cls):
+        """Return all TestBeds with their testequipment, equipment, and function
+        records fetched together, without a query per testbed.
+        """
+        tequery = (_Testequipment.select(_Testequipment, Equipment, Function)
+                   .join(Equipment)
+                   .switch(_Testequipment)
+                   .join(Function, JOIN.LEFT_OUTER))
+        return prefetch(cls.select(), tequery)
+
     def get_DUT(self):
         return self.get_equipment_with_role("DUT")
 
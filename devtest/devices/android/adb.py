@@ -777,6 +777,24 @@ class DeviceProcess:
     async def write(self, data):
         return await self.socket.sendall(data)
 
+    async def read_until(self, marker):
+        """Read output until it ends with marker.
+
+        For request and response use of a long running process, such as a
+        shell, where each response is terminated with a known marker.
+
+        Returns:
+            The output before the marker, or None if the process exited first.
+        """
+        buf = bytearray()
+        while not buf.endswith(marker):
+            data = await self.socket.recv(MAX_PAYLOAD)
+            if not data:
+                return None
+            buf += data
+        del buf[-len(marker):]
+        return bytes(buf)
+
     async def close(self):
         if self.socket is not None:
             await self.socket.close()
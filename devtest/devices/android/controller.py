@@ -20,6 +20,7 @@ import os
 import re
 import io
 import stat
+import shlex
 from datetime import datetime, timezone
 from ast import literal_eval
 from array import array
@@ -416,13 +417,13 @@ class _Buttons:
     def __init__(self, controller):
         self._cont = controller
 
-    def press(self, keycode):
-        """Insert a a keyevent for the given keycode.
+    def press(self, *keycodes):
+        """Insert a a keyevent for each of the given keycodes.
 
         See: https://developer.android.com/reference/android/view/KeyEvent
         for possible codes.
         """
-        return self._cont.shell(['input', 'keyevent', keycode])
+        return self._cont.shell(['input', 'keyevent', *keycodes])
 
     def power(self):
         """Wake up device by using wakeup key.
@@ -690,6 +691,18 @@ class _Settings:
             cmd.append(str(default))
         return self._cont.shell(cmd)
 
+    def put_many(self, namespace, pairs):
+        """Set several settings in one namespace, with one shell command.
+
+        Args:
+            namespace: one of "system", "secure", "global".
+            pairs: iterable of (key, value) tuples.
+        """
+        cmd = " && ".join("settings put {} {} {}".format(
+            namespace, shlex.quote(key), shlex.quote(self._encode(value)))
+            for key, value in pairs)
+        return self._cont.shell(cmd)
+
     def delete(self, namespace, key):
         return self._cont.shell(['settings', 'delete', namespace, key])
 
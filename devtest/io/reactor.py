@@ -84,6 +84,20 @@ def _get_kernel(selector=None):
     atexit.register(_shutdown_kernel)
 
 
+def reset_after_fork():
+    """Forget the parent's kernel in a forked child process.
+
+    The child gets its own kernel, with a new selector, when get_kernel is next
+    called. The inherited kernel is not shut down, since its tasks belong to
+    the parent, but the child's copy of its selector is closed.
+    """
+    global _default_kernel
+    kern = _default_kernel
+    _default_kernel = None
+    if kern is not None:
+        kern._selector.close()
+
+
 def get_new_kernel(**kwargs):
     selector = eventloop.EventLoop()
     kwargs["selector"] = selector
@@ -140,6 +140,16 @@ def get_loglevel():
             return level
 
 
+def enabled(level):
+    """Return True if messages of the given level would be logged.
+
+    The level may be a syslog level value or a name from LEVELS.
+    """
+    if isinstance(level, str):
+        level = LEVELS[level.upper()]
+    return bool(syslog.LOG_MASK(level) & syslog.setlogmask(0))
+
+
 def loglevel_restore():
     syslog.setlogmask(_oldloglevel)
 
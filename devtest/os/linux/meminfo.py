@@ -46,6 +46,9 @@ MemUsage = namedtuple("MemUsage",
                        "VmFlags"])
 
 
+_MemUsage_fields = frozenset(MemUsage._fields)
+
+
 # Not using Python 3.7 defaults to keep compatible with Python 3.6
 def _MemUsage_defaults():
     d = dict(zip_longest(MemUsage._fields, [0], fillvalue=0))
@@ -147,12 +150,13 @@ class Maps(list):
                 if line.startswith(b"Name:"):  # compatibility with older kernels
                     continue
                 name, rest = line.split(b':')
-                if name == b'VmFlags':
+                name = name.decode("ascii")
+                if name == 'VmFlags':
                     currentusage["VmFlags"] = VmFlags.from_string(rest.strip())
-                else:
+                elif name in _MemUsage_fields:  # Newer kernels add fields.
                     val, unit = rest.split()
                     val = int(val) * units[unit]
-                    currentusage[name.decode("ascii")] = val
+                    currentusage[name] = val
         if currentvma is not None:
             currentusage["Uss"] = (currentusage["Private_Clean"] +
                                    currentusage["Private_Dirty"])
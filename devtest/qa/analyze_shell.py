@@ -65,7 +65,7 @@ class ShellInterface:
         except options.GetoptError as geo:
             _usage(geo)
         for opt, optarg in opts:
-            if opt in "h?":
+            if opt in ("h", "?"):
                 _usage()
             elif opt == "d":
                 debug += 1
@@ -78,9 +78,7 @@ class ShellInterface:
         globalargs = self.arguments.pop(0)
         self.config = cf = config.get_config(initdict=globalargs.options,
                                              _filename=extra_config)
-        cf.flags.debug = debug
-        cf.flags.use_local = use_local
-        cf.flags.do_list = do_list
+        cf.flags.update(debug=debug, use_local=use_local, do_list=do_list)
 
     def run(self):
         if self.config.flags.do_list:
@@ -129,8 +127,9 @@ def do_list():
 
 def _usage(err=None):
     if err is not None:
-        print(err, file=sys.stderr)
-    print(ShellInterface.__doc__, file=sys.stderr)
+        sys.stderr.write(f"{err}\n{ShellInterface.__doc__}\n")
+    else:
+        sys.stderr.write(f"{ShellInterface.__doc__}\n")
     raise UsageError()
 
 
@@ -733,6 +733,15 @@ class TestSuite:
     def __iter__(self):
         return iter(self._tests)
 
+    def reset(self, name=None, doc=None):
+        """Remove all tests and results, so this suite may be used again."""
+        self._doc = doc or self.__doc__
+        self.test_name = name or self.implementation.replace("testcases.", "")
+        self.result = TestResult.NA
+        self._tests = []
+        self._testset.clear()
+        self._multitestset.clear()
+
     def _add_with_prereq(self, entry, _auto=False):
         if self._debug < 3:
             for prereq in entry.inst.OPTIONS.prerequisites:
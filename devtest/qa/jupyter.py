@@ -18,7 +18,6 @@
 from devtest import config
 from devtest import options
 from devtest.db import controllers
-from devtest.qa import bases
 from devtest.qa import runner
 from devtest.qa import loader
 from devtest.qa import scanner
@@ -31,15 +30,8 @@ ModuleType = type(config)
 
 
 def find_runnables(include=None, exclude=None):
-    testlist = []
-    for obj in scanner.iter_all_runnables(include=include, exclude=exclude):
-        if type(obj) is ModuleType:
-            testlist.append(obj.__name__)
-        elif issubclass(obj, bases.TestCase):
-            testlist.append("{}.{}".format(obj.__module__, obj.__name__))
-        elif issubclass(obj, bases.Scenario):
-            testlist.append("{}.{}".format(obj.__module__, obj.__name__))
-    return testlist
+    return [name for kind, name in scanner.iter_runnable_names(include=include, exclude=exclude)
+            if kind != scanner.KIND_UNKNOWN]
 
 
 class JupyterInterface:
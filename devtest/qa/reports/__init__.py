@@ -13,9 +13,15 @@
 """Base class and factory functions for reporting objects.
 """
 
+import os
+import atexit
 import locale
 import pkgutil
+import queue
+import threading
 
+from devtest import json
+from devtest import logging
 from devtest import importlib
 from devtest.qa.signals import *  # noqa
 from devtest.core.exceptions import ReportFindError
@@ -167,6 +173,116 @@ class StackedReport(list, BaseReport):
             rpt.finalize()
 
 
+class DataWriter:
+    """Writes test data files from a background thread.
+
+    Data is encoded when it is written, so later changes by the test don't
+    affect what is stored. If the same file gets data more than once the
+    top-level object becomes a list of them, and data queued for the same
+    file is merged using a single read and write.
+
+    Use get_data_writer() to get the writer shared by all reports, so that
+    only one thread reads and writes the data files.
+    """
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name="DataWriter",
+                                        daemon=True)
+        self._thread.start()
+
+    def write(self, fpath, data, callback=None):
+        """Queue data to be written to the file at fpath.
+
+        The optional callback is called from the writer thread after the data
+        is written, with True if the data was added to an existing file.
+        """
+        self._queue.put((fpath, json.dumps(data), callback))
+
+    def flush(self):
+        """Wait for all queued data to be written."""
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self):
+        """Wait for pending data to be written and stop the thread."""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        running = True
+        while running:
+            pending = {}
+            count = 0
+            item = self._queue.get()
+            while True:
+                count += 1
+                if item is None:
+                    running = False
+                    break
+                fpath, text, callback = item
+                pending.setdefault(fpath, []).append((text, callback))
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            for fpath, items in pending.items():
+                try:
+                    existed = _merge_data_file(fpath, [text for text, cb in items])
+                except Exception as ex:  # noqa
+                    logging.exception_error("DataWriter: {}".format(fpath), ex)
+                    continue
+                for text, callback in items:
+                    if callback is not None:
+                        try:
+                            callback(existed)
+                        except Exception as ex:  # noqa
+                            logging.exception_error("DataWriter: {}".format(fpath), ex)
+                    existed = True
+            for _ in range(count):
+                self._queue.task_done()
+
+
+def _merge_data_file(fpath, texts):
+    try:
+        with open(fpath) as fo:
+            data = json.load(fo)
+    except FileNotFoundError:
+        existed = False
+        data = json.loads(texts.pop(0))
+    else:
+        existed = True
+    for text in texts:
+        if isinstance(data, list):
+            data.append(json.loads(text))
+        else:
+            data = [data, json.loads(text)]
+    with open(fpath, "w") as fo:
+        fo.write(json.dumps(data))
+    return existed
+
+
+_data_writer = None
+_data_writer_lock = threading.Lock()
+
+
+def get_data_writer():
+    """Return the DataWriter shared by all reports in this process.
+
+    A forked process gets its own, since the thread doesn't survive the fork.
+    Queued data is written before the interpreter exits.
+    """
+    global _data_writer
+    with _data_writer_lock:
+        if _data_writer is None or _data_writer.pid != os.getpid():
+            _data_writer = DataWriter()
+            atexit.register(_data_writer.flush)
+        return _data_writer
+
+
 def get_report(rname):
     """Report object factory.
 
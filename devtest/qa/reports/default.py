@@ -19,13 +19,12 @@ Also servers as usage example of TestCase signals.
 
 import sys
 import os
+import functools
 from datetime import timezone
 
-from devtest import json
+from . import BaseReport, get_data_writer
 
-from . import BaseReport
-
-WIDTH, LINES = os.get_terminal_size()
+DEFAULT_WIDTH = 80
 
 RESET = "\x1b[0m"  # aka NORMAL
 
@@ -73,6 +72,17 @@ _BOXCHARS_A = {1: ['+', '=', '|', '+', '+', '+'],
                3: ['+', '+', '|', '+', '+', '+']}
 
 
+@functools.lru_cache()
+def _box_lines(style, length):
+    """Return top line, vertical side, and bottom line of a unicode box.
+
+    The horizontal lines have `length` characters between the corners.
+    """
+    UL, hor, vert, UR, LL, LR = _BOXCHARS[style]
+    line = hor * length
+    return UL + line + UR, vert, LL + line + LR
+
+
 def white(text):
     return WHITE + text + RESET
 
@@ -113,7 +123,34 @@ def inverse_red(text):
     return INVERSE_ON + RED + text + RESET + INVERSE_OFF
 
 
+# Pre-colored result tags, since these never change.
+TAG_PASSED = green("PASSED")
+TAG_FAILED = red("FAILED")
+TAG_INCOMPLETE = yellow("INCOMPLETE")
+TAG_EXPECTED_FAILED = lt_red("EXPECTED FAILED")
+TAG_ABORTED = inverse_red("ABORTED")
+TAG_WARNING = yellow(" warning:")
+TAG_DIAGNOSTIC = magenta("diagnostic:")
+TAG_ARGUMENTS = cyan("    arguments:")
+
+TAG_PASSED_U = green('✔')
+TAG_FAILED_U = red('✘')
+TAG_INCOMPLETE_U = yellow('⁇')
+TAG_EXPECTED_FAILED_U = cyan('✘')
+TAG_ABORTED_U = inverse_red('‼')
+
+
+_UNICODE_HANDLERS = ("on_test_passed", "on_test_incomplete", "on_test_failure",
+                     "on_test_expected_failure", "on_test_abort", "on_run_start",
+                     "on_suite_start")
+
+
 class DefaultReport(BaseReport):
+    """Report to the terminal, or a file if the "reportfile" option is set.
+
+    Unicode symbols and boxes are used if the "unicode" option is true.
+    """
+    UNICODE = False
 
     def initialize(self, config=None):
         reportfile = config.get("reportfile")
@@ -127,153 +164,175 @@ class DefaultReport(BaseReport):
         if config is not None:
             self._logdir = config.get("resultsdir", "/tmp")
             self.timezone = config.get("timezone", timezone.utc)
+            self._verbosity = config.get("verbosity", 1)
+            use_unicode = config.get("unicode", self.UNICODE)
         else:
             self.timezone = timezone.utc
+            self._verbosity = 1
+            use_unicode = self.UNICODE
+        if use_unicode:
+            # Instance attributes, so the signals are connected to these.
+            for name in _UNICODE_HANDLERS:
+                setattr(self, name, getattr(self, "_{}_unicode".format(name)))
+        self._ts_cache = (None, None)
+        self._termwidth = None
         super().initialize(config=config)
 
+    @property
+    def _width(self):
+        # Only query the terminal when something is actually printed.
+        if self._termwidth is None:
+            try:
+                self._termwidth = os.get_terminal_size().columns
+            except OSError:
+                self._termwidth = DEFAULT_WIDTH
+        return self._termwidth
+
+    def _fmt_ts(self, dt):
+        # Many events are often sent with the same time object.
+        cached_dt, ts = self._ts_cache
+        if dt is not cached_dt:
+            ts = dt.astimezone(self.timezone).timetz().isoformat()
+            self._ts_cache = (dt, ts)
+        return ts
+
     def finalize(self):
         super(DefaultReport, self).finalize()
+        get_data_writer().flush()  # Data messages go to the report file.
         if self._doclose:
             self._file.close()
         self._file = None
 
     def on_test_start(self, testcase, time=None):
         name = testcase.test_name
-        ts = time.astimezone(self.timezone).timetz().isoformat()
-        nw = WIDTH - len(ts) - 1
-        print("\n{W}{0:{width}s} {B}{1}{R}".format(name, ts,
-              width=nw, W=UNDERLINE_ON, B=BLUE, R=RESET), file=self._file)
+        ts = self._fmt_ts(time)
+        nw = self._width - len(ts) - 1
+        self._file.write(f"\n{UNDERLINE_ON}{name:{nw}s} {BLUE}{ts}{RESET}\n")
 
     def on_test_end(self, testcase, time=None):
-        ts = time.astimezone(self.timezone).timetz().isoformat()
-        print("{U}{}{R} ended at {B}{:s}{R}".format(testcase.test_name,
-              ts, B=BLUE, R=RESET, U=UNDERLINE_ON), file=self._file)
+        ts = self._fmt_ts(time)
+        self._file.write(
+            f"{UNDERLINE_ON}{testcase.test_name}{RESET} ended at {BLUE}{ts}{RESET}\n")
 
     def on_test_passed(self, testcase, message=None):
-        print("{}: {!s}".format(green("PASSED"), message), file=self._file)
+        self._file.write(f"{TAG_PASSED}: {message!s}\n")
 
     def on_test_incomplete(self, testcase, message=None):
-        print("{}: {!s}".format(yellow("INCOMPLETE"), message),
-              file=self._file)
+        self._file.write(f"{TAG_INCOMPLETE}: {message!s}\n")
 
     def on_test_failure(self, testcase, message=None):
-        print("{}: {!s}".format(red("FAILED"), message), file=self._file)
+        self._file.write(f"{TAG_FAILED}: {message!s}\n")
 
     def on_test_expected_failure(self, testcase, message=None):
-        print("{}: {!s}".format(lt_red("EXPECTED FAILED"), message),
-              file=self._file)
+        self._file.write(f"{TAG_EXPECTED_FAILED}: {message!s}\n")
 
     def on_test_abort(self, testcase, message=None):
-        print("{}: {!s}".format(inverse_red("ABORTED"), message),
-              file=self._file)
+        self._file.write(f"{TAG_ABORTED}: {message!s}\n")
 
     def on_test_info(self, testcase, message=None):
-        print(" info:", message, file=self._file)
+        if self._verbosity < 1:
+            return
+        self._file.write(f" info: {message}\n")
 
     def on_test_warning(self, testcase, message=None):
-        print(yellow(" warning:"), message, file=self._file)
+        if self._verbosity < 1:
+            return
+        self._file.write(f"{TAG_WARNING} {message}\n")
 
     def on_test_diagnostic(self, testcase, message=None):
-        print(magenta("diagnostic:"), message, file=self._file)
+        if self._verbosity < 1:
+            return
+        self._file.write(f"{TAG_DIAGNOSTIC} {message}\n")
 
     def on_test_arguments(self, testcase, arguments=None):
+        if self._verbosity < 1:
+            return
         if arguments:
-            print(cyan("    arguments:"), arguments, file=self._file)
+            self._file.write(f"{TAG_ARGUMENTS} {arguments}\n")
 
     def on_suite_start(self, testsuite, time=None):
-        ts = time.astimezone(self.timezone).timetz().isoformat()
-        nw = WIDTH - len(ts) - 13
-        print("\nstart suite {W}{0:{width}s} {B}{1}{R}".format(
-              testsuite.test_name, ts, width=nw, W=WHITE, B=BLUE, R=RESET),
-              file=self._file)
+        ts = self._fmt_ts(time)
+        nw = self._width - len(ts) - 13
+        self._file.write(
+            f"\nstart suite {WHITE}{testsuite.test_name:{nw}s} {BLUE}{ts}{RESET}\n")
 
     def on_suite_end(self, testsuite, time=None):
-        ts = time.astimezone(self.timezone).timetz().isoformat()
-        print("\nTestSuite {!r} ended at {B}{:s}{R}\n".format(
-            testsuite.test_name, ts, B=BLUE, R=RESET), file=self._file)
+        ts = self._fmt_ts(time)
+        self._file.write(
+            f"\nTestSuite {testsuite.test_name!r} ended at {BLUE}{ts}{RESET}\n\n")
 
     def on_suite_info(self, testsuite, message=None):
-        print("suite info:", message, file=self._file)
+        self._file.write(f"suite info: {message}\n")
 
     def on_run_start(self, runner, time=None):
-        ts = time.astimezone(self.timezone).timetz().isoformat()
-        print("Runner start at {!s}.".format(blue(ts)), file=self._file)
+        ts = self._fmt_ts(time)
+        self._file.write(f"Runner start at {BLUE}{ts}{RESET}.\n")
 
     def on_run_end(self, runner, time=None):
-        ts = time.astimezone(self.timezone).timetz().isoformat()
-        print("Runner end at {!s}.".format(blue(ts)), file=self._file)
+        ts = self._fmt_ts(time)
+        self._file.write(f"Runner end at {BLUE}{ts}{RESET}.\n")
 
     def on_run_error(self, runner, exc=None):
-        print("Run error {}.".format(red(str(exc))), file=self._file)
+        self._file.write(f"Run error {RED}{exc!s}{RESET}.\n")
 
     def on_dut_version(self, device, build=None, variant=None):
-        print(("DUT version: {!s} ({})").format(build, variant), file=self._file)
+        self._file.write(f"DUT version: {build!s} ({variant})\n")
 
     def on_logdir_location(self, runner, path=None):
         self._logdir = path
-        print("Results location:", path, file=self._file)
+        self._file.write(f"Results location: {path}\n")
 
     def on_test_data(self, testcase, data=None):
-        # If the same test is run multiple times, add new data to top-level
-        # list. Make a new top-level list if required.
-        fname = "{}_data.json".format(testcase.test_name.replace(".", "_"))
+        # If the same test is run multiple times, new data is added to a
+        # top-level list in the same file. The message is shown once the data
+        # writer thread has written it.
+        fname = f"{testcase.test_name.replace('.', '_')}_data.json"
         fpath = os.path.join(self._logdir, fname)
-        olddata = None
-        if os.path.exists(fpath):
-            with open(fpath) as fo:
-                olddata = json.load(fo)
-            if isinstance(olddata, list):
-                olddata.append(data)
-                data = olddata
-            else:
-                data = [olddata, data]
-        with open(fpath, "w") as fo:
-            json.dump(data, fo)
-        print(" Data {}:".format("added to" if olddata else "available in"),
-              repr(fname), file=self._file)
+        get_data_writer().write(fpath, data, functools.partial(self._on_data_written, fname))
+
+    def _on_data_written(self, fname, added):
+        self._file.write(f" Data {'added to' if added else 'available in'}: {fname!r}\n")
 
     def on_suite_summary(self, suite, result=None):
-        print("Aggregate Suite Result:", result, file=self._file)
+        self._file.write(f"Aggregate Suite Result: {result}\n")
 
     def on_run_comment(self, runner, message=None):
-        print("NOTE:", str(message), file=self._file)
+        self._file.write(f"NOTE: {message!s}\n")
 
+    # Unicode variants, installed by initialize() if unicode is selected.
 
-class DefaultReportUnicode(DefaultReport):
+    def _on_test_passed_unicode(self, testcase, message=None):
+        self._file.write(f"{TAG_PASSED_U} {message!s}\n")
 
-    def on_test_passed(self, testcase, message=None):
-        print("{} {!s}".format(green('✔'), message), file=self._file)
+    def _on_test_incomplete_unicode(self, testcase, message=None):
+        self._file.write(f"{TAG_INCOMPLETE_U} {message!s}\n")
 
-    def on_test_incomplete(self, testcase, message=None):
-        print("{} {!s}".format(yellow('⁇'), message), file=self._file)
+    def _on_test_failure_unicode(self, testcase, message=None):
+        self._file.write(f"{TAG_FAILED_U} {message!s}\n")
 
-    def on_test_failure(self, testcase, message=None):
-        print("{} {!s}".format(red('✘'), message), file=self._file)
+    def _on_test_expected_failure_unicode(self, testcase, message=None):
+        self._file.write(f"{TAG_EXPECTED_FAILED_U} {message!s}\n")
 
-    def on_test_expected_failure(self, testcase, message=None):
-        print("{} {!s}".format(cyan('✘'), message), file=self._file)
+    def _on_test_abort_unicode(self, testcase, message=None):
+        self._file.write(f"{TAG_ABORTED_U} {message!s}\n")
 
-    def on_test_abort(self, testcase, message=None):
-        print("{} {!s}".format(inverse_red('‼'), message), file=self._file)
+    def _on_run_start_unicode(self, runner, time=None):
+        ts = self._fmt_ts(time)
+        nw = self._width - len(ts) - 2
+        text = f"Start run at {ts:{nw}s}"
+        tt, vert, bt = _box_lines(1, len(text) + 2)
+        self._file.write(f"{tt}\n{vert} {text} {vert}\n{bt}\n")
 
-    def on_run_start(self, runner, time=None):
-        UL, hor, vert, UR, LL, LR = _BOXCHARS[1]
-        ts = time.astimezone(self.timezone).timetz().isoformat()
-        nw = WIDTH - len(ts) - 2
-        text = "Start run at {:{width}s}".format(ts, width=nw)
-        tt = "{}{}{}".format(UL, hor * (len(text) + 2), UR)
-        bt = "{}{}{}".format(LL, hor * (len(text) + 2), LR)
-        ml = "{} {} {}".format(vert, text, vert)
-        print(tt, ml, bt, sep="\n", file=self._file)
+    def _on_suite_start_unicode(self, testsuite, time=None):
+        ts = self._fmt_ts(time)
+        nw = self._width - len(ts) - 21
+        tt, vert, bt = _box_lines(2, self._width - 2)
+        ml = f"{vert} Start TestSuite: {testsuite.test_name:{nw}s} {BLUE}{ts}{RESET}{vert}"
+        self._file.write(f"{tt}\n{ml}\n{bt}\n")
 
-    def on_suite_start(self, testsuite, time=None):
-        UL, hor, vert, UR, LL, LR = _BOXCHARS[2]
-        ts = time.astimezone(self.timezone).timetz().isoformat()
-        nw = WIDTH - len(ts) - 21
-        tt = "{}{}{}".format(UL, hor * (WIDTH - 2), UR)
-        bt = "{}{}{}".format(LL, hor * (WIDTH - 2), LR)
-        ml = "{0} Start TestSuite: {1:{width}s} {B}{2}{R}{3}".format(
-            vert, testsuite.test_name, ts, vert, width=nw, B=BLUE, R=RESET)
-        print(tt, ml, bt, sep="\n", file=self._file)
+
+class DefaultReportUnicode(DefaultReport):
+    """Default report that always uses unicode symbols and boxes."""
+    UNICODE = True
 
 # vim:ts=4:sw=4:softtabstop=4:smarttab:expandtab:fileencoding=utf-8
@@ -16,15 +16,28 @@
 """
 
 import os
+import functools
+import threading
 from datetime import timezone
 
-from devtest import json
-
-from . import BaseReport
+from . import BaseReport, get_data_writer
 
 widgets = None
 display = None
 
+# Message row with time stamp on the right.
+_ROW_WITH_TS = ('<div style="display:table;width=100%%">'
+                '  <div style="display:table-row">'
+                '    <div style="display:table-cell;width:80%%">%s</div>'
+                '    <div style="display:table-cell;color:blue;text-align:right">%s</div>'
+                '  </div></div>')
+
+# Flush buffered HTML to the output widget when it grows beyond this size.
+HTML_FLUSH_SIZE = 65536
+# Start a new HTML widget once the current one holds this much, since every
+# update resends the whole value.
+HTML_WIDGET_SIZE = 1048576
+
 
 class JupyterReport(BaseReport):
 
@@ -35,32 +48,65 @@ class JupyterReport(BaseReport):
         import ipywidgets as widgets
         from IPython import display
         self._logdir = "/tmp"
+        self._html_buf = []
+        self._html_bytes = 0
+        self._html = None
+        # Data messages are displayed from the data writer thread.
+        self._html_lock = threading.RLock()
         widgets.register_comm_target()
         self._out = widgets.Output(layout={"width": "100%"})
         display.display(self._out)
         if config is not None:
             self._logdir = config.get("resultsdir", "/tmp")
             self.timezone = config.get("timezone", timezone.utc)
+            self._verbosity = config.get("verbosity", 1)
         else:
             self.timezone = timezone.utc
+            self._verbosity = 1
+        self._ts_cache = (None, None)
         super().initialize(config=config)
 
     def finalize(self):
+        get_data_writer().flush()  # Data messages go to the output widget.
         self._display_html("<hr/>")
+        self._flush_html()
+        self._html = None
         self._out = None
         super().finalize()
 
+    def _fmt_ts(self, dt):
+        # Many events are often sent with the same time object.
+        cached_dt, ts = self._ts_cache
+        if dt is not cached_dt:
+            ts = dt.astimezone(self.timezone).timetz().isoformat()
+            self._ts_cache = (dt, ts)
+        return ts
+
     def _display_html(self, string, time=None):
         if time is not None:
-            ts = time.astimezone(self.timezone).timetz().isoformat()
-            s = ('<div style="display:table;width=100%">'
-                 '  <div style="display:table-row">'
-                 '    <div style="display:table-cell;width:80%">{}</div>'
-                 '    <div style="display:table-cell;color:blue;text-align:right">{}</div>'
-                 '  </div></div>').format(string, ts)
+            s = _ROW_WITH_TS % (string, self._fmt_ts(time))
         else:
             s = string
-        self._out.append_display_data(display.HTML(s))
+        with self._html_lock:
+            self._html_buf.append(s)
+            self._html_bytes += len(s)
+            if self._html_bytes > HTML_FLUSH_SIZE:
+                self._flush_html()
+
+    def _flush_html(self):
+        # Each fragment gets its own block, as it would when displayed singly.
+        # Fragments are added to one HTML widget, rather than each flush
+        # adding another display item to the output.
+        with self._html_lock:
+            if self._html_buf:
+                html = "".join("<div>{}</div>".format(s) for s in self._html_buf)
+                if self._html is None or len(self._html.value) > HTML_WIDGET_SIZE:
+                    self._html = widgets.HTML(value=html)
+                    self._out.append_display_data(self._html)
+                else:
+                    self._html.value += html
+                self._html_buf = []
+                self._html_bytes = 0
 
     def on_run_start(self, runner, time=None):
         self._display_html('<div style="font-size:120%;font-weight:bold">'
@@ -68,6 +114,7 @@ class JupyterReport(BaseReport):
 
     def on_run_end(self, runner, time=None):
         self._display_html("Runner end", time=time)
+        self._flush_html()
 
     def on_suite_start(self, suite, time=None):
         self._display_html(
@@ -77,6 +124,7 @@ class JupyterReport(BaseReport):
     def on_suite_end(self, suite, time=None):
         self._display_html(
             'End Test Suite <em>{}</em><br/>'.format(suite.test_name), time=time)
+        self._flush_html()
 
     def on_test_start(self, testcase, time=None):
         name = testcase.test_name
@@ -88,6 +136,7 @@ class JupyterReport(BaseReport):
         name = testcase.test_name
         self._display_html(
             'End Test Case <em>{}</em>'.format(name), time=time)
+        self._flush_html()
 
     def on_test_passed(self, testcase, message=None):
         self._display_html(
@@ -110,17 +159,25 @@ class JupyterReport(BaseReport):
             '<span style="color:yellow">ABORTED</span>: {!s}'.format(message))
 
     def on_test_info(self, testcase, message=None):
+        if self._verbosity < 1:
+            return
         self._display_html('{}<br/>'.format(message))
 
     def on_test_warning(self, testcase, message=None):
+        if self._verbosity < 1:
+            return
         self._display_html(
             'Warning: <span style="color:pink">{}</span><br/>'.format(message))
 
     def on_test_diagnostic(self, testcase, message=None):
+        if self._verbosity < 1:
+            return
         self._display_html(
             'Diagnostic: <span style="color:magenta">{}</span><br/>'.format(message))
 
     def on_test_arguments(self, testcase, arguments=None):
+        if self._verbosity < 1:
+            return
         if arguments:
             self._display_html(
                 'Arguments: <span style="color:cyan">{}</span><br/>'.format(arguments))
@@ -131,6 +188,7 @@ class JupyterReport(BaseReport):
     def on_run_error(self, runner, exc=None):
         self._display_html(
             '<div class="error">Run error: {}</div>'.format(exc))
+        self._flush_html()
 
     def on_dut_version(self, device, build=None, variant=None):
         self._display_html("DUT version: {!s} ({})<br/>".format(build, variant))
@@ -145,23 +203,16 @@ class JupyterReport(BaseReport):
         # display purposes for now.
 
     def on_test_data(self, testcase, data=None):
-        # If the same test is run multiple times, add new data to top-level
-        # list. Make a new top-level list if required.
+        # If the same test is run multiple times, new data is added to a
+        # top-level list in the same file. The message is shown once the data
+        # writer thread has written it.
         fname = "{}_data.json".format(testcase.test_name.replace(".", "_"))
         fpath = os.path.join(self._logdir, fname)
-        olddata = None
-        if os.path.exists(fpath):
-            with open(fpath) as fo:
-                olddata = json.load(fo)
-            if isinstance(olddata, list):
-                olddata.append(data)
-                data = olddata
-            else:
-                data = [olddata, data]
-        with open(fpath, "w") as fo:
-            json.dump(data, fo)
+        get_data_writer().write(fpath, data, functools.partial(self._on_data_written, fname))
+
+    def _on_data_written(self, fname, added):
         self._display_html("Data: {} {!r}<br/>".format(
-            "added to" if olddata else "available in", fname))
+            "added to" if added else "available in", fname))
 
 
 # vim:ts=4:sw=4:softtabstop=4:smarttab:expandtab
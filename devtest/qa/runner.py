@@ -15,13 +15,18 @@
 
 import sys
 import os
+import functools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
 
-import pytz
+try:
+    from zoneinfo import ZoneInfo as _get_timezone
+except ImportError:  # Python < 3.9
+    from pytz import timezone as _get_timezone
 
 from .. import logging
 from .. import services
-from .. import debugger
 from ..ui import simpleui
 from ..core.constants import TestResult
 
@@ -34,6 +39,14 @@ from .signals import (run_start, run_end, run_error, report_testbed,
 
 ModuleType = type(os)
 
+# The runner that forked worker processes use to run tests, and the process
+# it was set up in.
+_worker_runner = None
+_worker_pid = None
+
+# Maximum number of temporary suites kept for reuse.
+SUITE_POOL_SIZE = 4
+
 
 class TestRunner:
     """Runs test objects.
@@ -45,6 +58,7 @@ class TestRunner:
         self.config = cfg
         self._testbed = None
         self._origfd = None
+        self._suite_pool = []
 
     @property
     def testbed(self):
@@ -89,20 +103,15 @@ class TestRunner:
         """
         results = []
         testcases = []
+        handlers = {}
+        runargs = (self.config, self.testbed, self._ui)
         for obj in objects:
             objecttype = type(obj)
-            if objecttype is type:
-                if issubclass(obj, bases.TestCase):
-                    testcases.append(obj)
-                elif issubclass(obj, bases.Scenario):
-                    results.append(obj.run(self.config, self.testbed, self._ui))
-            elif isinstance(obj, bases.TestSuite):
-                obj.run()
-                results.append(obj.result)
-            elif objecttype is ModuleType and hasattr(obj, "run"):
-                results.append(self._run_module(obj))
-            else:
-                logging.warn("{!r} is not a runnable object.".format(obj))
+            try:
+                handler = handlers[objecttype]
+            except KeyError:
+                handler = handlers[objecttype] = self._get_object_handler(objecttype)
+            handler(obj, runargs, results, testcases)
         # Run any accumulated bare test classes.
         if testcases:
             if len(testcases) > 1:
@@ -112,13 +121,43 @@ class TestRunner:
             results.append(rv)
         return _aggregate_returned_results(results)
 
-    def _run_module(self, module_with_run):
+    def _get_object_handler(self, objecttype):
+        if objecttype is type:
+            return self._handle_class
+        elif issubclass(objecttype, bases.TestSuite):
+            return self._handle_suite
+        elif objecttype is ModuleType:
+            return self._handle_module
+        else:
+            return self._handle_unknown
+
+    def _handle_class(self, obj, runargs, results, testcases):
+        if issubclass(obj, bases.TestCase):
+            testcases.append(obj)
+        elif issubclass(obj, bases.Scenario):
+            results.append(obj.run(*runargs))
+
+    def _handle_suite(self, obj, runargs, results, testcases):
+        obj.run()
+        results.append(obj.result)
+
+    def _handle_module(self, obj, runargs, results, testcases):
+        if hasattr(obj, "run"):
+            results.append(self._run_module(obj, runargs))
+        else:
+            self._handle_unknown(obj, runargs, results, testcases)
+
+    def _handle_unknown(self, obj, runargs, results, testcases):
+        logging.warning("{!r} is not a runnable object.".format(obj))
+
+    def _run_module(self, module_with_run, runargs):
         try:
-            rv = module_with_run.run(self.config, self.testbed, self._ui)
+            rv = module_with_run.run(*runargs)
         except:  # noqa
             ex, val, tb = sys.exc_info()
             run_error.send(self, exc=val)
-            if self.config.flags.debug:
+            if runargs[0].flags.debug:
+                from .. import debugger
                 debugger.post_mortem(tb)
             else:
                 logging.exception_error(module_with_run.__name__, val)
@@ -143,11 +182,13 @@ class TestRunner:
             INCOMPLETE, or ABORT.
         """
 
-        suite = bases.TestSuite(self.config, self.testbed, self._ui,
-                                name="{}Suite".format(testclass.__name__))
-        suite.add_test(testclass, *args, **kwargs)
-        suite.run()
-        return suite.result
+        suite = self._get_tempsuite("{}Suite".format(testclass.__name__))
+        try:
+            suite.add_test(testclass, *args, **kwargs)
+            suite.run()
+            return suite.result
+        finally:
+            self._release_tempsuite(suite)
 
     def run_tests(self, testclasses):
         """Run a list of test classes.
@@ -159,15 +200,75 @@ class TestRunner:
             testclasses:
                 A list of classes that are subclasses of bases.TestCase.
 
+        If the `numprocesses` flag is not 1 the test classes are run in
+        parallel, see `run_tests_parallel`.
+
         Returns:
             The return value of the temporary TestSuite instance.
         """
+        numprocesses = self.config.flags.get("numprocesses", 1)
+        if numprocesses != 1 and len(testclasses) > 1:
+            return self.run_tests_parallel(testclasses, numprocesses or os.cpu_count())
+
+        suite = self._get_tempsuite("RunTestsTempSuite")
+        try:
+            suite.add_tests(testclasses)
+            suite.run()
+            return suite.result
+        finally:
+            self._release_tempsuite(suite)
+
+    def _get_tempsuite(self, name):
+        testbed = self.testbed
+        while self._suite_pool:
+            suite = self._suite_pool.pop()
+            if suite.testbed is testbed and suite.UI is self._ui:
+                suite.reset(name=name)
+                return suite
+        return bases.TestSuite(self.config, testbed, self._ui, name=name)
+
+    def _release_tempsuite(self, suite):
+        if len(self._suite_pool) < SUITE_POOL_SIZE:
+            suite.reset()
+            self._suite_pool.append(suite)
+
+    def run_tests_parallel(self, testclasses, numprocesses):
+        """Run a list of test classes in a pool of worker processes.
+
+        Each test class runs in its own temporary TestSuite, as with
+        `run_test`, in a worker forked from this process. Idle workers take
+        the next test class from a shared queue, so long running tests don't
+        hold up the others.
+
+        Workers don't use this process's event loop, testbed or report. Each
+        one constructs its own testbed, for the same testbed name, and reports
+        to standard output with a default report. So only use this with tests
+        that don't need exclusive use of testbed equipment.
 
-        suite = bases.TestSuite(self.config, self.testbed, self._ui,
-                                name="RunTestsTempSuite")
-        suite.add_tests(testclasses)
-        suite.run()
-        return suite.result
+        Arguments:
+            testclasses:
+                A list of classes that are subclasses of bases.TestCase.
+            numprocesses:
+                Maximum number of worker processes.
+
+        Returns:
+            The aggregate result of all test classes.
+        """
+        global _worker_runner
+        sys.stdout.flush()
+        sys.stderr.flush()
+        _worker_runner = self
+        # Workers must be forked to inherit the runner. Python 3.6 lacks the
+        # mp_context argument, but fork is its default on POSIX.
+        poolargs = {"max_workers": min(numprocesses, len(testclasses))}
+        if sys.version_info >= (3, 7):
+            poolargs["mp_context"] = multiprocessing.get_context("fork")
+        try:
+            with ProcessPoolExecutor(**poolargs) as pool:
+                results = list(pool.map(_run_test_worker, testclasses))
+        finally:
+            _worker_runner = None
+        return _aggregate_returned_results(results)
 
     def initialize(self):
         """Perform any initialization needed by the test runner.
@@ -175,15 +276,14 @@ class TestRunner:
         """
         cf = self.config
         cf.timezone = get_local_timezone()
-        cf.resultsdir = os.path.expandvars(os.path.expanduser(cf.resultsdir))
+        cf.resultsdir = _resolve_path(cf.resultsdir)
         cf.username = os.environ["USER"]
         logging.openlog(ident="Devtest", usestderr=cf.flags.stderr)
         self.initialize_report()
         start_time = datetime.now(timezone.utc)
         ts = start_time.strftime("%Y%m%d_%H%M%S")
         cf.logdir = os.path.join(cf.resultsdir, ts)
-        if not os.path.exists(cf.logdir):
-            os.makedirs(cf.logdir)
+        os.makedirs(cf.logdir, exist_ok=True)
         # Initialize all service modules
         services.initialize()
         run_start.send(self, time=start_time)
@@ -213,13 +313,35 @@ class TestRunner:
         rpt.initialize(config=cf)
         self.report = rpt
 
+    def _initialize_worker(self):
+        # Set up a forked worker process, so that it doesn't drive the
+        # parent's event loop, device connections, or report output. The
+        # inherited objects are kept, but not used or finalized, since they
+        # belong to the parent.
+        reactor = sys.modules.get("devtest.io.reactor")
+        if reactor is not None:
+            reactor.reset_after_fork()
+        self._inherited = (self._testbed, self.report)
+        self._testbed = None  # Constructed again on first use.
+        self._suite_pool = []
+        rpt = self.report
+        for rpt in (rpt if isinstance(rpt, reports.StackedReport) else [rpt]):
+            reports.BaseReport.finalize(rpt)  # Only disconnects its signals.
+        cf = self.config
+        rpt = reports.get_report("default")
+        rpt.initialize(config={"resultsdir": cf.get("logdir", cf.get("resultsdir")),
+                               "timezone": cf.get("timezone", timezone.utc),
+                               "verbosity": cf.get("verbosity", 1),
+                               "unicode": cf.get("unicode", False)})
+        self.report = rpt
+
     def finalize(self):
         """Perform any finalization needed by the test runner.
         Sends runner end messages to report. Finalizes report.
         """
         run_end.send(self, time=datetime.now(timezone.utc))
         if self._origfd is not None:
-            _restore_stderr(self._origfd)
+            _restore_stderr(self._origfd, self.config.flags.get("fsync_stderr", False))
             self._origfd = None
         self.testbed.finalize()
         self.report.finalize()
@@ -230,27 +352,44 @@ class TestRunner:
         del self.report
 
 
+def _run_test_worker(testclass):
+    global _worker_pid
+    if _worker_pid != os.getpid():
+        _worker_pid = os.getpid()
+        _worker_runner._initialize_worker()
+    rv = _worker_runner.run_test(testclass)
+    reports.get_data_writer().flush()
+    sys.stdout.flush()
+    return rv
+
+
 def _aggregate_returned_results(resultlist):
-    resultset = {TestResult.PASSED: 0, TestResult.FAILED: 0,
-                 TestResult.EXPECTED_FAIL: 0, TestResult.INCOMPLETE: 0,
-                 TestResult.NA: 0, None: 0}
-    for res in resultlist:
-        resultset[res] += 1
     # Fail if any fail, else incomplete if any incomplete, pass if all pass.
-    if resultset[TestResult.FAILED] > 0:
-        return TestResult.FAILED
-    elif resultset[TestResult.INCOMPLETE] > 0:
+    # Compared by value, since run() functions may return plain ints or bools.
+    incomplete = notapplicable = passed = False
+    for result in resultlist:
+        if result is None:
+            notapplicable = True
+        elif result == TestResult.FAILED:
+            return TestResult.FAILED
+        elif result == TestResult.INCOMPLETE:
+            incomplete = True
+        elif result == TestResult.PASSED:
+            passed = True
+        else:
+            logging.warning("Result {!r} not counted in aggregate result.".format(result))
+    if incomplete:
         return TestResult.INCOMPLETE
-    elif resultset[None] > 0:
+    elif notapplicable:
         return TestResult.NA
-    elif resultset[TestResult.PASSED] > 0:
+    elif passed:
         return TestResult.PASSED
     else:
         return TestResult.INCOMPLETE
 
 
 def _redirect_stderr(name):
-    fd = os.open(name, os.O_WRONLY | os.O_TRUNC | os.O_CREAT | os.O_NOFOLLOW | os.O_SYNC,
+    fd = os.open(name, os.O_WRONLY | os.O_TRUNC | os.O_CREAT | os.O_APPEND | os.O_NOFOLLOW,
                  mode=0o644)
     stderr_orig = os.dup(2)
     os.dup2(fd, 2)
@@ -258,18 +397,26 @@ def _redirect_stderr(name):
     return stderr_orig
 
 
-def _restore_stderr(oldfd):
+def _restore_stderr(oldfd, sync=False):
     sys.stderr.flush()
+    if sync:
+        os.fsync(2)
     os.dup2(oldfd, 2)
     os.close(oldfd)
 
 
+@functools.lru_cache(maxsize=64)
+def _resolve_path(path):
+    return os.path.expandvars(os.path.expanduser(path))
+
+
+@functools.lru_cache(maxsize=1)
 def get_local_timezone():
     try:
         link = os.readlink("/etc/localtime")
         tzname = "/".join(link.split("/")[-2:])
     except OSError:
         tzname = open("/etc/timezone").read().strip()
-    return pytz.timezone(tzname)
+    return _get_timezone(tzname)
 
 # vim:ts=4:sw=4:softtabstop=4:smarttab:expandtab:fileencoding=utf-8
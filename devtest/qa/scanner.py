@@ -16,27 +16,221 @@ namespace. The default namespace package is called "testcases".
 
 from __future__ import generator_stop
 
+import os
 import re
 import sys
 import pkgutil
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from importlib.machinery import all_suffixes
 
 from .. import importlib
+from .. import json
+from ..core.types import Enum
 
 from .bases import TestCase, TestSuite, Scenario
 
+ModuleType = type(os)
+
 
 __all__ = ['iter_module_specs', 'iter_modules', 'iter_subclasses',
            'iter_testcases', 'iter_testsuites', 'iter_scenarios',
-           'iter_any_class', 'iter_all_runnables', 'iter_module_classes']
+           'iter_any_class', 'iter_all_runnables', 'iter_module_classes',
+           'iter_runnable_names', 'clear_cache', 'Kind', 'KIND_MODULE', 'KIND_TEST',
+           'KIND_SCENARIO', 'KIND_UNKNOWN']
+
+# Scan results are kept so repeated scans in the same process are cheap.
+# Entries are checked against file and directory modification times, so
+# edited, added, or removed test modules are noticed.
+CACHE_SIZE = 1024
+# Maximum number of threads used to load test modules. Modules are loaded
+# serially unless the DEVTEST_IMPORT_THREADS environment variable is above 1.
+IMPORT_THREADS = int(os.environ.get("DEVTEST_IMPORT_THREADS", 1))
+
+
+class Kind(Enum):
+    """Kinds of runnable objects yielded by iter_runnable_names."""
+    UNKNOWN = 0
+    MODULE = 1
+    TEST = 2
+    SCENARIO = 3
+
+
+KIND_MODULE = Kind.MODULE
+KIND_TEST = Kind.TEST
+KIND_SCENARIO = Kind.SCENARIO
+KIND_UNKNOWN = Kind.UNKNOWN
+
+# File that keeps the runnable object names between program runs.
+RUNNABLES_CACHE = os.path.join(
+    os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+    "devtester", "runnables.json")
+_RUNNABLES = None
+_SPEC_CACHE = OrderedDict()
+_MODULE_CACHE = OrderedDict()
+_CLASS_CACHE = OrderedDict()
+
+
+def clear_cache():
+    """Forget all cached scan results."""
+    global _RUNNABLES
+    _RUNNABLES = None
+    _SPEC_CACHE.clear()
+    _MODULE_CACHE.clear()
+    _CLASS_CACHE.clear()
+
+
+def _cache_put(cache, key, value):
+    cache[key] = value
+    if len(cache) > CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+def _get_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
 
-class _DummyExcluder:
-    def search(self, string):
-        return False
+
+_PatternType = type(re.compile(""))  # re.Pattern is only in 3.7+
+
+
+def _get_patterns(patterns, name):
+    """Normalize an include or exclude option to a list of patterns."""
+    if not patterns:
+        return []
+    if isinstance(patterns, (str, _PatternType)) or not isinstance(patterns, (list, tuple)):
+        patterns = [patterns]
+    for pattern in patterns:
+        if not isinstance(pattern, str) and not hasattr(pattern, "search"):
+            raise ValueError(
+                "{} option should be string or RE object.".format(name.capitalize()))
+    return patterns
+
+
+_DEFAULT_FLAGS = re.compile("").flags
+
+
+def _union(patterns):
+    return "|".join("(?:{})".format(getattr(p, "pattern", p)) for p in patterns)
+
+
+# Global inline flags, numbered backreferences and named groups change meaning,
+# or are errors, once a pattern is no longer alone and at the start.
+_UNFUSABLE = re.compile(r"\(\?[aiLmsux]+\)|\\[1-9]|\(\?P[<=]")
+
+
+def _fusable(pattern):
+    if isinstance(pattern, str):
+        return not _UNFUSABLE.search(pattern)
+    return (getattr(pattern, "flags", None) == _DEFAULT_FLAGS and
+            isinstance(pattern.pattern, str) and not _UNFUSABLE.search(pattern.pattern))
+
+
+def _patterns_key(patterns):
+    return tuple((getattr(p, "pattern", p), getattr(p, "flags", None)) for p in patterns)
 
 
-class _DummyIncluder:
+def _compile(pattern):
+    return re.compile(pattern) if isinstance(pattern, str) else pattern
+
+
+class _NameFilter:
+    """Combined include and exclude matcher for module names.
+
+    Names with a private component, containing "._", never match. This and the
+    patterns that can be safely joined are fused into one regular expression,
+    so that usually each name is checked with a single search. Other patterns,
+    such as ones with flags or backreferences, are matched separately.
+    """
+
+    def __init__(self, include, exclude):
+        self.key = (_patterns_key(include), _patterns_key(exclude))
+        fused_exclude = [p for p in exclude if _fusable(p)]
+        self._exclude = [_compile(p) for p in exclude if not _fusable(p)]
+        source = r"^(?!.*?\._)"
+        if fused_exclude:
+            source += "(?!.*?(?:{}))".format(_union(fused_exclude))
+        if all(_fusable(p) for p in include):
+            if include:
+                source += ".*?(?:{})".format(_union(include))
+            self._include = []
+        else:
+            fused_include = [p for p in include if _fusable(p)]
+            self._include = [_compile(p) for p in include if not _fusable(p)]
+            if fused_include:
+                self._include.append(re.compile(_union(fused_include)))
+        self._search = re.compile(source).search
+        if not self._include and not self._exclude:
+            self.search = self._search
+
     def search(self, string):
-        return True
+        if not self._search(string):
+            return False
+        if self._include and not any(p.search(string) for p in self._include):
+            return False
+        return not any(p.search(string) for p in self._exclude)
+
+
+# Module file suffixes in the same priority order the import system uses.
+_SUFFIXES = tuple(all_suffixes())
+
+
+def _get_module_name(filename):
+    for suffix in _SUFFIXES:
+        if filename.endswith(suffix):
+            return filename[:-len(suffix)], _SUFFIXES.index(suffix)
+    return None, None
+
+
+def _walk_specs(path, prefix, onerror, dirtimes):
+    """Yield (name, getspec, ispkg) for modules and packages under the path list.
+
+    Like pkgutil.walk_packages, but uses os.scandir so that directory entry
+    types come from the directory listing, rather than a stat per file.
+    Private names are skipped altogether. Every directory scanned is added,
+    with its modification time, to the dirtimes list.
+    """
+    modules = {}
+    packages = set()
+    for dirpath in path:
+        dirtimes.append((dirpath, _get_mtime(dirpath)))
+        try:
+            entries = list(os.scandir(dirpath))
+        except OSError:
+            continue
+        for entry in entries:
+            name = entry.name
+            if name.startswith("_"):
+                continue
+            if entry.is_dir():
+                if "." not in name and any(
+                        os.path.isfile(os.path.join(entry.path, "__init__" + suffix))
+                        for suffix in _SUFFIXES):
+                    packages.add(name)
+                continue
+            modname, priority = _get_module_name(name)
+            if not modname or "." in modname:
+                continue
+            current = modules.get(modname)
+            if current is None or priority < current[0]:
+                modules[modname] = (priority, entry.path)
+    for name in sorted(packages.union(modules)):
+        fullname = prefix + name
+        if name in packages:
+            yield fullname, None, True
+            try:
+                pkg = importlib.import_module(fullname)
+            except Exception:
+                onerror(fullname)
+            else:
+                yield from _walk_specs(getattr(pkg, "__path__", []), fullname + ".", onerror,
+                                       dirtimes)
+        else:
+            yield fullname, partial(importlib.spec_from_file_location, fullname,
+                                    modules[name][1]), False
 
 
 def iter_module_specs(package="testcases", onerror=None, include=None, exclude=None):
@@ -47,25 +241,13 @@ def iter_module_specs(package="testcases", onerror=None, include=None, exclude=N
         package: str, name of base package to start scanning from.
         onerror: optional callable that will be called on ImportError. Callable
                  will be called with subpackage name.
-        include: str or compiled regular expression. Names to explicity include.
-        exclude: str or compiled regular expression. Matches will be excluded from modules
-                 yielded. Optional.
+        include: str or compiled regular expression, or a list of them. Names to
+                 explicity include.
+        exclude: str or compiled regular expression, or a list of them. Matches will
+                 be excluded from modules yielded. Optional.
     """
-    if include:
-        if isinstance(include, str):
-            include = re.compile(include)
-        if not hasattr(include, "search"):
-            raise ValueError("Include option should be string or RE object.")
-    else:
-        include = _DummyIncluder()
-
-    if exclude:
-        if isinstance(exclude, str):
-            exclude = re.compile(exclude)
-        if not hasattr(exclude, "search"):
-            raise ValueError("Exclude option should be string or RE object.")
-    else:
-        exclude = _DummyExcluder()
+    namefilter = _NameFilter(_get_patterns(include, "include"),
+                             _get_patterns(exclude, "exclude"))
 
     try:
         mod = importlib.import_module(package)
@@ -76,25 +258,102 @@ def iter_module_specs(package="testcases", onerror=None, include=None, exclude=N
             print("The package {!r} could not be imported.".format(package),
                   file=sys.stderr)
         return
-    for finder, name, ispkg in pkgutil.walk_packages(
-            path=mod.__path__, prefix=mod.__name__ + '.', onerror=onerror):
-        if not ispkg and "._" not in name and include.search(name) and not exclude.search(name):
-            spec = finder.find_spec(name)
+    key = (package, namefilter.key)
+    cached = _SPEC_CACHE.get(key)
+    if cached is not None:
+        specs, dirtimes = cached
+        if all(_get_mtime(path) == mtime for path, mtime in dirtimes):
+            _SPEC_CACHE.move_to_end(key)
+            yield from specs
+            return
+    errors = []
+
+    def _onerror(name):
+        errors.append(name)
+        if callable(onerror):
+            onerror(name)
+
+    dirtimes = []
+    if getattr(mod, "__file__", None):
+        walker = _walk_specs(mod.__path__, mod.__name__ + ".", _onerror, dirtimes)
+    else:  # namespace package
+        walker = ((name, partial(finder.find_spec, name), ispkg)
+                  for finder, name, ispkg in pkgutil.walk_packages(
+                      path=mod.__path__, prefix=mod.__name__ + '.', onerror=_onerror))
+    specs = []
+    packages = []
+    # Specs are only made for names that pass the filter.
+    for name, getspec, ispkg in walker:
+        if ispkg:
+            packages.append(name)
+        elif namefilter.search(name):
+            spec = getspec()
+            specs.append(spec)
             yield spec
+    # Only complete, error free, scans are cached. Every walked directory is
+    # checked, so modules added to a subpackage without any are noticed.
+    if not errors:
+        if not dirtimes:  # namespace package, walked by pkgutil
+            dirs = list(mod.__path__)
+            for name in packages:
+                dirs.extend(getattr(sys.modules.get(name), "__path__", []))
+            dirtimes = [(path, _get_mtime(path)) for path in dirs]
+        _cache_put(_SPEC_CACHE, key, (specs, dirtimes))
+
+
+def _load_module(spec):
+    mod = importlib.module_from_spec(spec)
+    try:
+        spec.loader.exec_module(mod)
+    except (ImportError, AttributeError) as err:
+        return mod, err
+    return mod, None
 
 
 def iter_modules(package="testcases", onerror=None, include=None, exclude=None):
+    """Yield the modules in package, subject to include and exclude patterns.
+
+    Modules not already loaded are imported serially in the calling thread,
+    unless DEVTEST_IMPORT_THREADS in the environment is set above 1. Then up
+    to that many worker threads are used, so module level code may run outside
+    the main thread and concurrently with other test modules. A module that
+    fails to load in a worker thread with an error other than ImportError, such
+    as when calling signal.signal, is executed again in the main thread, so
+    any side effects of its module level code happen twice.
+    """
+    specs = []
+    loaded = {}
     for spec in iter_module_specs(package=package, onerror=onerror,
                                   include=include, exclude=exclude):
-        mod = importlib.module_from_spec(spec)
-        try:
-            spec.loader.exec_module(mod)
-        except (ImportError, AttributeError) as err:
+        mtime = _get_mtime(spec.origin) if spec.origin else None
+        cached = _MODULE_CACHE.get(spec.name)
+        if cached is not None and mtime is not None and cached[1] == mtime:
+            _MODULE_CACHE.move_to_end(spec.name)
+            loaded[spec.name] = (cached[0], None)
+        specs.append((spec, mtime))
+    # Module loading is mostly file I/O, so overlap it using threads.
+    toload = [spec for spec, mtime in specs if spec.name not in loaded]
+    if len(toload) > 1 and IMPORT_THREADS > 1:
+        with ThreadPoolExecutor(max_workers=min(IMPORT_THREADS, len(toload))) as executor:
+            futures = [(spec, executor.submit(_load_module, spec)) for spec in toload]
+        for spec, future in futures:
+            if future.exception() is None:
+                loaded[spec.name] = future.result()
+            else:  # May only work in the main thread, so try again here.
+                loaded[spec.name] = _load_module(spec)
+    else:
+        for spec in toload:
+            loaded[spec.name] = _load_module(spec)
+    for spec, mtime in specs:
+        mod, err = loaded[spec.name]
+        if err is not None:
             if callable(onerror):
                 onerror("{}.{}: {}".format(mod.__package__, mod.__name__, err))
             else:
                 print(err, file=sys.stderr)
             continue
+        if mtime is not None:
+            _cache_put(_MODULE_CACHE, spec.name, (mod, mtime))
         yield mod
 
 
@@ -130,12 +389,112 @@ def iter_all_runnables(package="testcases", onerror=None, include=None, exclude=
         yield from iter_module_classes(mod, (TestCase, Scenario))
 
 
+def iter_runnable_names(package="testcases", onerror=None, include=None, exclude=None):
+    """Yield (kind, name) tuples for all runnable objects.
+
+    The kind is one of the KIND_* values defined here. The names are
+    kept in the RUNNABLES_CACHE file, per package and include/exclude options,
+    and the modules are only imported again when any module file in the
+    package was added, removed, or changed.
+    """
+    errors = []
+
+    def _onerror(name):
+        errors.append(name)
+        if callable(onerror):
+            onerror(name)
+
+    specs = list(iter_module_specs(package=package, onerror=_onerror,
+                                   include=include, exclude=exclude))
+    signature = [[spec.name, _get_mtime(spec.origin) if spec.origin else None]
+                 for spec in specs]
+    # JSON object keys must be strings.
+    cachekey = repr((package, _patterns_key(_get_patterns(include, "include")),
+                     _patterns_key(_get_patterns(exclude, "exclude"))))
+    cache = _load_runnables_cache()
+    entry = cache.get(cachekey)
+    if not errors and entry and entry["signature"] == signature:
+        try:
+            runnables = [(Kind(kind), sys.intern(name)) for kind, name in entry["runnables"]]
+        except (ValueError, TypeError):  # Written by an older version.
+            pass
+        else:
+            yield from runnables
+            return
+    runnables = []
+    intern = sys.intern
+    for obj in iter_all_runnables(package=package, onerror=_onerror,
+                                  include=include, exclude=exclude):
+        if type(obj) is ModuleType:
+            kind, name = KIND_MODULE, obj.__name__
+        elif TestCase in obj.__mro__:
+            kind, name = KIND_TEST, intern(f"{obj.__module__}.{obj.__name__}")
+        elif Scenario in obj.__mro__:
+            kind, name = KIND_SCENARIO, intern(f"{obj.__module__}.{obj.__name__}")
+        else:
+            kind, name = KIND_UNKNOWN, repr(obj)
+        runnables.append((kind, name))
+        yield kind, name
+    # Only complete, error free, scans are saved.
+    if not errors:
+        cache[cachekey] = {"signature": signature,
+                           "runnables": [(int(kind), name) for kind, name in runnables]}
+        _save_runnables_cache(cache)
+
+
+def _load_runnables_cache():
+    # The file content is also kept in memory, while the file is unchanged.
+    global _RUNNABLES
+    mtime = _get_mtime(RUNNABLES_CACHE)
+    if _RUNNABLES is not None and _RUNNABLES[:2] == (RUNNABLES_CACHE, mtime):
+        return _RUNNABLES[2]
+    try:
+        cache = json.from_file(RUNNABLES_CACHE)
+    except (OSError, ValueError):
+        cache = {}
+    _RUNNABLES = (RUNNABLES_CACHE, mtime, cache)
+    return cache
+
+
+def _save_runnables_cache(cache):
+    global _RUNNABLES
+    tempname = "{}.{}".format(RUNNABLES_CACHE, os.getpid())
+    try:
+        os.makedirs(os.path.dirname(RUNNABLES_CACHE), exist_ok=True)
+        with open(tempname, "w", encoding="utf8") as fo:
+            json.dump(cache, fo)
+        os.replace(tempname, RUNNABLES_CACHE)
+    except OSError:
+        _RUNNABLES = None
+    else:
+        _RUNNABLES = (RUNNABLES_CACHE, _get_mtime(RUNNABLES_CACHE), cache)
+
+
 def iter_module_classes(mod, baseclass):
-    for name in dir(mod):
-        if not name.startswith("_"):
-            obj = getattr(mod, name)
-            if type(obj) is type and issubclass(obj, baseclass):
-                yield obj
+    """Yield classes in module that are subclasses of baseclass.
+
+    Results are cached per module and base class. Adding or removing names
+    from the module invalidates the entry.
+    """
+    key = (id(mod), baseclass)
+    size = len(vars(mod))
+    cached = _CLASS_CACHE.get(key)
+    if cached is not None and cached[0] is mod and cached[2] == size:
+        _CLASS_CACHE.move_to_end(key)
+        yield from cached[1]
+        return
+    classes = tuple(_scan_module_classes(mod, baseclass))
+    _cache_put(_CLASS_CACHE, key, (mod, classes, size))
+    yield from classes
+
+
+def _scan_module_classes(mod, baseclass):
+    # Only plain classes are considered, so a check of the MRO is equivalent
+    # to issubclass(), and checks all base classes at once.
+    targets = frozenset(baseclass if isinstance(baseclass, tuple) else (baseclass,))
+    for name, obj in vars(mod).items():
+        if name[0] != "_" and type(obj) is type and not targets.isdisjoint(obj.__mro__):
+            yield obj
 
 
 def _test(argv):
@@ -35,12 +35,7 @@ import sys
 
 from .. import config
 from .. import options
-from .. import debugger
 from ..textutils import colors
-from . import loader
-from . import runner
-from . import scanner
-from . import bases
 
 
 ModuleType = type(sys)
@@ -88,6 +83,36 @@ Use the `-l` option to print a list of runnable objects there are found when
 scanned.
 """  # noqa
 
+_USAGE_BYTES = (USAGE + "\n").encode("utf-8")
+
+
+# Command line options that set a flag in the configuration.
+_SWITCH_OPTIONS = {
+    "l": "do_list",
+    "L": "do_list_testbeds",
+    "R": "do_list_reports",
+    "C": "do_show_config",
+    "S": "do_show_testcase",
+    "E": "stderr",
+    "K": "keep",
+}
+
+_COUNT_OPTIONS = {
+    "d": "debug",
+    "v": "verbose",
+}
+
+# Command line options that set an attribute of the ShellInterface.
+_ATTRIBUTE_OPTIONS = {
+    "D": "debug_framework",
+    "P": "pick_tests",
+    "T": "pick_testbed",
+}
+
+_DEFAULT_FLAGS = dict.fromkeys(_SWITCH_OPTIONS.values(), False)
+_DEFAULT_FLAGS.update(dict.fromkeys(_COUNT_OPTIONS.values(), 0))
+_DEFAULT_FLAGS["repeat"] = 1
+
 
 class UsageError(Exception):
     pass
@@ -99,69 +124,38 @@ class ShellInterface:
     def __init__(self, argv):
         self.debug_framework = False
         self.pick_tests = False
-        debug = 0
-        verbose = 0
-        repeat = 1
+        self.pick_testbed = False
+        flags = dict(_DEFAULT_FLAGS)
         extra_config = None
-        do_list = False
-        do_list_testbeds = False
-        do_pick_testbed = False
-        do_list_reports = False
-        do_show_config = False
-        do_show_testcase = False
-        show_stderr = False
-        keep = False
         try:
             opts, self.arguments = options.getopt(argv, "h?dDEKvlLRSCc:r:PT")
         except options.GetoptError as geo:
             _usage(geo)
         for opt, optarg in opts:
-            if opt in "h?":
-                _usage()
-            elif opt == "d":
-                debug += 1
-            elif opt == "D":
-                self.debug_framework = True
-            elif opt == "v":
-                verbose += 1
-            elif opt == "l":
-                do_list = True
+            if opt in _SWITCH_OPTIONS:
+                flags[_SWITCH_OPTIONS[opt]] = True
+            elif opt in _COUNT_OPTIONS:
+                flags[_COUNT_OPTIONS[opt]] += 1
+            elif opt in _ATTRIBUTE_OPTIONS:
+                setattr(self, _ATTRIBUTE_OPTIONS[opt], True)
             elif opt == "c":
                 extra_config = optarg
             elif opt == "r":
-                repeat = int(optarg)
-            elif opt == "L":
-                do_list_testbeds = True
-            elif opt == "T":
-                do_pick_testbed = True
-            elif opt == "R":
-                do_list_reports = True
-            elif opt == "C":
-                do_show_config = True
-            elif opt == "S":
-                do_show_testcase = True
-            elif opt == "E":
-                show_stderr = True
-            elif opt == "K":
-                keep = True
-            elif opt == "P":
-                self.pick_tests = True
+                flags["repeat"] = max(int(optarg), 1)
+            elif opt in ("h", "?"):
+                _usage()
 
         globalargs = self.arguments.pop(0)
+        # Listing tests or reports does not need the configuration files.
+        listing = flags["do_list"] or (flags["do_list_reports"] and not flags["do_show_config"])
+        if listing and extra_config is None and not self.pick_testbed:
+            self.config = config.ConfigDict(flags=config.ConfigDict(flags, _depth=1))
+            return
         self.config = cf = config.get_config(initdict=globalargs.options,
                                              _filename=extra_config)
         # Adjust the configuration with the commandline options.
-        cf.flags.debug = debug
-        cf.flags.verbose = verbose
-        cf.flags.do_list = do_list
-        cf.flags.do_list_testbeds = do_list_testbeds
-        cf.flags.do_list_reports = do_list_reports
-        cf.flags.do_show_config = do_show_config
-        cf.flags.do_show_testcase = do_show_testcase
-        cf.flags.stderr = show_stderr
-        cf.flags.keep = keep
-        cf.flags.repeat = max(repeat, 1)
-        if do_pick_testbed:
+        cf.flags.update(flags)
+        if self.pick_testbed:
             cf["testbed"] = pick_testbed()
 
     def run(self):
@@ -178,12 +172,14 @@ class ShellInterface:
             return
         if not self.arguments and self.pick_tests:
             pick_tests(self.arguments)
+        from . import loader
         testlist = errlist = None
         try:
             testlist, errlist = loader.load_selections(self.arguments)
         except:  # noqa
             ex, val, tb = sys.exc_info()
             if self.debug_framework:
+                from .. import debugger
                 debugger.post_mortem(tb)
             else:
                 _print_exception(ex, val)
@@ -197,12 +193,14 @@ class ShellInterface:
                 rnr = displayer.TestReporter(self.config)
                 return rnr.showall(testlist)
             # One runner to run them all, one runner to find them...
+            from . import runner
             try:
                 rnr = runner.TestRunner(self.config)
                 return rnr.runall(testlist)
             except:  # noqa
                 ex, val, tb = sys.exc_info()
                 if self.debug_framework:
+                    from .. import debugger
                     debugger.post_mortem(tb)
                 else:
                     _print_exception(ex, val)
@@ -211,28 +209,29 @@ class ShellInterface:
 
 
 def do_list():
+    from . import scanner
+    # Line prefixes for kinds of runnable objects in the listing.
+    prefixes = {
+        scanner.KIND_MODULE: "    module " + colors.CYAN,
+        scanner.KIND_TEST: "      test " + colors.GREEN,
+        scanner.KIND_SCENARIO: "  scenario " + colors.YELLOW,
+    }
+    unknown_prefix = colors.RED + "  Unknown: "
     errlist = []
 
     def _onerror(err):
         errlist.append(err)
 
-    print(colors.white("Runnable objects:"))
-    for obj in scanner.iter_all_runnables(onerror=_onerror,
-                                          exclude="analyze"):
-        if type(obj) is ModuleType:
-            print("    module", colors.cyan("{}".format(obj.__name__)))
-        elif issubclass(obj, bases.TestCase):
-            print("      test", colors.green("{}.{}".format(
-                obj.__module__, obj.__name__)))
-        elif issubclass(obj, bases.Scenario):
-            print("  scenario", colors.yellow("{}.{}".format(
-                obj.__module__, obj.__name__)))
-        else:
-            print(colors.red("  Unknown: {!r}".format(obj)))
+    lines = [colors.white("Runnable objects:")]
+    for kind, name in scanner.iter_runnable_names(onerror=_onerror,
+                                                  exclude="analyze"):
+        lines.append(prefixes.get(kind, unknown_prefix) + name + colors.RESET)
     if errlist:
-        print("These could not be scanned:")
-        for errored in errlist:
-            print(colors.magenta(errored))
+        lines.append("These could not be scanned:")
+        lines.extend(colors.magenta(errored) for errored in errlist)
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
+    sys.stdout.flush()
 
 
 def list_reports():
@@ -247,15 +246,18 @@ def list_reports():
 def list_testbeds(verbose):
     from devtest.db import models
     models.connect()
-    print("Available testbeds:")
+    lines = ["Available testbeds:"]
     if verbose:
-        for tb in models.TestBed.select():
-            print(" ", colors.green(tb.name))
+        for tb in models.TestBed.select_with_equipment():
+            lines.append("  " + colors.GREEN + tb.name + colors.RESET)
             for te in tb.testequipment:
-                print("   ", te.equipment.name, "role:", te.function.name)
+                lines.append(f"    {te.equipment.name} role: {te.function.name}")
     else:
         for tb in models.TestBed.get_list():
-            print(" ", colors.green(tb))
+            lines.append("  " + colors.GREEN + tb + colors.RESET)
+    lines.append("")
+    sys.stdout.write("\n".join(lines))
+    sys.stdout.flush()
 
 
 def pick_testbed():
@@ -269,14 +271,11 @@ def pick_testbed():
 
 def pick_tests(argumentlist):
     from devtest.ui import simpleui
+    from . import scanner
     testlist = ["-done-"]
-    for obj in scanner.iter_all_runnables(exclude="analyze"):
-        if type(obj) is ModuleType:
-            testlist.append(obj.__name__)
-        elif issubclass(obj, bases.TestCase):
-            testlist.append("{}.{}".format(obj.__module__, obj.__name__))
-        elif issubclass(obj, bases.Scenario):
-            testlist.append("{}.{}".format(obj.__module__, obj.__name__))
+    for kind, name in scanner.iter_runnable_names(exclude="analyze"):
+        if kind != scanner.KIND_UNKNOWN:
+            testlist.append(name)
     while 1:
         sel = simpleui.choose(testlist,
                               prompt="Choose testable (-done- value to end)")
@@ -287,21 +286,33 @@ def pick_tests(argumentlist):
 
 
 def _print_exception(ex, val):
-    print("Error: {}: {}".format(ex.__name__, val), file=sys.stderr)
-    orig = val
-    while val.__context__ is not None:
-        val = val.__context__
-        print(" Within: {}: {}".format(val.__class__.__name__, val), file=sys.stderr)
-    val = orig
-    while val.__cause__ is not None:
-        val = val.__cause__
-        print("   From: {}: {}".format(val.__class__.__name__, val), file=sys.stderr)
+    lines = [f"Error: {ex.__name__}: {val}"]
+    # Follow the chain as Python reports it, explicit causes take precedence.
+    while True:
+        if val.__cause__ is not None:
+            val = val.__cause__
+            label = "   From"
+        elif val.__context__ is not None and not val.__suppress_context__:
+            val = val.__context__
+            label = " Within"
+        else:
+            break
+        lines.append(f"{label}: {val.__class__.__name__}: {val}")
+    lines.append("")
+    sys.stderr.write("\n".join(lines))
 
 
 def _usage(err=None):
     if err is not None:
-        print(err, file=sys.stderr)
-    print(USAGE, file=sys.stderr)
+        sys.stderr.write(f"{err}\n")
+    sys.stderr.flush()
+    # Write the pre-encoded text directly, if stderr has a binary buffer.
+    buf = getattr(sys.stderr, "buffer", None)
+    if buf is not None:
+        buf.write(_USAGE_BYTES)
+        buf.flush()
+    else:
+        sys.stderr.write(USAGE + "\n")
     raise UsageError()
 
 
@@ -12,63 +12,204 @@
 
 """Collection of framework synchronous signals.
 
-Based on the blinker package. Most testing framework activity is handled by a
-simple publish-subscribe designed using these signals.
-"""
-
-from blinker import Namespace
+Most testing framework activity is handled by a simple publish-subscribe
+designed using these signals.
 
+The Signal object has the same interface as the blinker package Signal, for
+the parts the framework uses. Receivers are dispatched from a prebuilt tuple,
+in the order they were connected.
+"""
 
-_signals = Namespace()
+import sys
+import weakref
+from inspect import ismethod
+
+ANY = object()
+_ANY_ID = id(ANY)
+
+
+def _make_id(obj):
+    if ismethod(obj):
+        return id(obj.__self__), id(obj.__func__)
+    return id(obj)
+
+
+class Signal:
+    """A named, synchronous, signal.
+
+    Receivers are called with the sender as the only positional argument, and
+    the keyword arguments given to `send`. They may be connected for all
+    senders, or a specific one. Weakly connected receivers are disconnected
+    automatically when they are garbage collected, and receivers for a
+    specific sender when that sender is.
+    """
+
+    def __init__(self, name, doc=None):
+        self.name = sys.intern(name)
+        self.__doc__ = doc
+        # sender id -> {receiver id: (receiver or weak reference, weak)}
+        self._receivers = {_ANY_ID: {}}
+        # sender id -> tuple of (receiver or weak reference, weak)
+        self._entries = {_ANY_ID: ()}
+        self._sender_refs = {}
+
+    def __repr__(self):
+        return "{}({!r})".format(self.__class__.__name__, self.name)
+
+    def connect(self, receiver, sender=ANY, weak=True):
+        """Connect receiver to be called when this signal is sent.
+
+        Arguments:
+            receiver: a callable.
+            sender: only call the receiver when sent by this object. Default is
+                    any sender.
+            weak: Keep only a weak reference to the receiver. Default True.
+
+        Returns:
+            The receiver, so this may be used as a decorator.
+        """
+        receiverid = _make_id(receiver)
+        senderid = _ANY_ID if sender is ANY else id(sender)
+        if weak:
+            cleanup = self._get_receiver_cleanup(receiverid, senderid)
+            if ismethod(receiver):
+                target = weakref.WeakMethod(receiver, cleanup)
+            else:
+                target = weakref.ref(receiver, cleanup)
+        else:
+            target = receiver
+        self._receivers.setdefault(senderid, {})[receiverid] = (target, weak)
+        self._update(senderid)
+        if sender is not ANY and senderid not in self._sender_refs:
+            try:
+                self._sender_refs[senderid] = weakref.ref(
+                    sender, self._get_sender_cleanup(senderid))
+            except TypeError:  # Sender can't be weakly referenced.
+                pass
+        if receiver_connected._entries[_ANY_ID]:
+            receiver_connected.send(self, receiver=receiver, sender=sender, weak=weak)
+        return receiver
+
+    def disconnect(self, receiver, sender=ANY):
+        """Disconnect receiver from this signal."""
+        senderid = _ANY_ID if sender is ANY else id(sender)
+        self._remove(_make_id(receiver), senderid)
+
+    def send(self, *sender, **kwargs):
+        """Call all receivers connected for any sender, or this sender.
+
+        The sender is positional only, so receivers may take a "sender"
+        keyword argument, as `receiver_connected` receivers do.
+
+        Returns:
+            A list of (receiver, return value) tuples.
+        """
+        if len(sender) > 1:
+            raise TypeError("send() accepts only one positional sender.")
+        sender = sender[0] if sender else None
+        entries = self._entries
+        receivers = entries[_ANY_ID]
+        if len(entries) > 1:
+            receivers += entries.get(id(sender), ())
+        results = []
+        for receiver, weak in receivers:
+            if weak:
+                receiver = receiver()
+                if receiver is None:
+                    continue
+            results.append((receiver, receiver(sender, **kwargs)))
+        return results
+
+    def _update(self, senderid):
+        receivers = self._receivers.get(senderid)
+        if receivers or senderid == _ANY_ID:
+            self._entries[senderid] = tuple(receivers.values())
+        else:
+            self._receivers.pop(senderid, None)
+            self._entries.pop(senderid, None)
+            self._sender_refs.pop(senderid, None)
+
+    def _remove(self, receiverid, senderid):
+        receivers = self._receivers.get(senderid)
+        if receivers and receivers.pop(receiverid, None) is not None:
+            self._update(senderid)
+
+    def _get_receiver_cleanup(self, receiverid, senderid):
+        selfref = weakref.ref(self)
+
+        def _cleanup(ref):
+            signal = selfref()
+            if signal is not None:
+                receivers = signal._receivers.get(senderid)
+                # Only remove if not replaced by a new receiver with the same id.
+                if receivers and receivers.get(receiverid, (None,))[0] is ref:
+                    signal._remove(receiverid, senderid)
+        return _cleanup
+
+    def _get_sender_cleanup(self, senderid):
+        selfref = weakref.ref(self)
+
+        def _cleanup(ref):
+            signal = selfref()
+            if signal is not None and signal._sender_refs.get(senderid) is ref:
+                signal._receivers.pop(senderid, None)
+                signal._entries.pop(senderid, None)
+                del signal._sender_refs[senderid]
+        return _cleanup
+
+
+# Sent when any receiver is connected to any signal.
+receiver_connected = Signal('receiver-connected')
+Signal.receiver_connected = receiver_connected
 
 # test case events
-test_start = _signals.signal('test-start')
-test_end = _signals.signal('test-end')
-test_passed = _signals.signal('test-passed')
-test_incomplete = _signals.signal('test-incomplete')
-test_failure = _signals.signal('test-failure')
-test_expected_failure = _signals.signal('test-expected-failure')
-test_abort = _signals.signal('test-abort')
-test_info = _signals.signal('test-info')
-test_warning = _signals.signal('test-warning')
-test_diagnostic = _signals.signal('test-diagnostic')
-test_data = _signals.signal('test-data')
-test_arguments = _signals.signal('test-arguments')
-test_version = _signals.signal('test-version')
+test_start = Signal('test-start')
+test_end = Signal('test-end')
+test_passed = Signal('test-passed')
+test_incomplete = Signal('test-incomplete')
+test_failure = Signal('test-failure')
+test_expected_failure = Signal('test-expected-failure')
+test_abort = Signal('test-abort')
+test_info = Signal('test-info')
+test_warning = Signal('test-warning')
+test_diagnostic = Signal('test-diagnostic')
+test_data = Signal('test-data')
+test_arguments = Signal('test-arguments')
+test_version = Signal('test-version')
 
 # runner events
-run_start = _signals.signal('run-start')
-run_end = _signals.signal('run-end')
-run_error = _signals.signal('run-error')
+run_start = Signal('run-start')
+run_end = Signal('run-end')
+run_error = Signal('run-error')
 
 # suite events
-suite_start = _signals.signal('suite-start')
-suite_end = _signals.signal('suite-end')
-suite_info = _signals.signal('suite-info')
-suite_summary = _signals.signal('suite-summary')
+suite_start = Signal('suite-start')
+suite_end = Signal('suite-end')
+suite_info = Signal('suite-info')
+suite_summary = Signal('suite-summary')
 
 # informational
-target_model = _signals.signal('target-model')
-target_build = _signals.signal('target-build')
-logdir_location = _signals.signal('logdir-location')
+target_model = Signal('target-model')
+target_build = Signal('target-build')
+logdir_location = Signal('logdir-location')
 
 # reporting events
-report_comment = _signals.signal('report-comment')
-report_testbed = _signals.signal('report-testbed')
-report_final = _signals.signal('report-final')
+report_comment = Signal('report-comment')
+report_testbed = Signal('report-testbed')
+report_final = Signal('report-final')
 
 # services
-service_want = _signals.signal('service-want')
-service_dontwant = _signals.signal('service-dontwant')
-service_provide = _signals.signal('service-provide')
-service_start = _signals.signal('service-start')
-service_stop = _signals.signal('service-stop')
+service_want = Signal('service-want')
+service_dontwant = Signal('service-dontwant')
+service_provide = Signal('service-provide')
+service_start = Signal('service-start')
+service_stop = Signal('service-stop')
 
 # device state changes
-device_change = _signals.signal('device-change')
+device_change = Signal('device-change')
 
 # Data analysis
-data_convert = _signals.signal('data-convert')
+data_convert = Signal('data-convert')
 
 
 def _test(argv):
@@ -82,7 +223,6 @@ def _test(argv):
 
 
 if __name__ == "__main__":
-    import sys
     _test(sys.argv)
 
 # vim:ts=4:sw=4:softtabstop=4:smarttab:expandtab
@@ -14,15 +14,21 @@ Implementations of abstract role interfaces. Test cases can get objects from
 here via the testbed attribute. The `get_role` method queries the implementation
 field of an equipment, that should point to something in here. But it could be
 in another package.
+
+The base classes define `__slots__`. Subclasses may define their own
+`__slots__` for any attributes they add, to keep instances small.
 """
 
-import abc
+import functools
 
 from .. import importlib
 from .. import config
 
-class BaseRole(metaclass=abc.ABCMeta):
+
+class BaseRole:
     """Base, abstract, role for equipment role controllers."""
+    __slots__ = ("config", "_equipment")
+
     def __init__(self, equipment):
         cf = config.get_config()
         self.config = cf.roles.get(equipment["role"], config.ConfigDict())
@@ -39,10 +45,12 @@ class BaseRole(metaclass=abc.ABCMeta):
         pass
 
 
-class SoftwareRole(metaclass=abc.ABCMeta):
+class SoftwareRole:
     """Base, abstract, role for software objects.
 
     Usually, this is an emulator of some kind."""
+    __slots__ = ("_software",)
+
     def __init__(self, software):
         self._software = software
         self.initialize()
@@ -57,6 +65,7 @@ class SoftwareRole(metaclass=abc.ABCMeta):
         pass
 
 
+@functools.lru_cache(maxsize=None)
 def get_role(classpath):
     """Get a role implementation by its path name."""
     return importlib.get_class(classpath, __name__)
@@ -23,6 +23,16 @@ from devtest.devices.android import controller
 
 from . import BaseRole
 
+# Common image types, so mimetypes does not have to load the system tables.
+_IMAGE_TYPES = {
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+}
+
 
 class ImageDisplayer(BaseRole):
     r"""Display images on a phone.
@@ -45,14 +55,20 @@ class ImageDisplayer(BaseRole):
 
     def initialize(self):
         self._controller = controller.AndroidController(self._equipment)
+        self._pushed = {}
+        self._resolved = {}
         self.destdir = self.config.get("destdir",
                                        ImageDisplayer.DESTINATION_DEFAULT)
         # turn off auto brightness and dim screen so target doesn't get washed
         # out.
         brightness = self.config.get("brightness",
                                      ImageDisplayer.BRIGHTNESS_DEFAULT)
-        self._controller.settings.put("system", "screen_brightness_mode", False)
-        self._controller.settings.put("system", "screen_brightness", brightness)
+        self._controller.settings.put_many("system", [("screen_brightness_mode", False),
+                                                      ("screen_brightness", brightness)])
+        # Stage any configured images now, so displaying them needs no push.
+        images = self.config.get("images")
+        if images:
+            self.push_images(images)
 
     def finalize(self):
         self._controller.buttons.home()
@@ -62,23 +78,72 @@ class ImageDisplayer(BaseRole):
             self._controller.close()
             self._controller = None
 
-    def prepare(self, filename, destdir=None):
+    def push_images(self, filenames, destdir=None):
+        """Push image files to the device in one sync session.
+
+        Files that were already pushed, and have not changed since, are not
+        pushed again.
+
+        Returns:
+            List of (remotepath, mimetype) tuples, one for each file.
+        """
         destdir = destdir or self.destdir
-        filename = os.fspath(filename)
-        filename = os.path.expandvars(os.path.expanduser(filename))
-        mimetype, enc = mimetypes.guess_type(filename)
-        remotepath = os.path.join(destdir, os.path.basename(filename))
-        self._controller.adb.push([filename], destdir, sync=True)
-        self._controller.buttons.power()
+        result = []
+        topush = []
+        for name in filenames:
+            key = (name, destdir)
+            try:
+                filename, remotepath, mimetype = self._resolved[key]
+            except KeyError:
+                filename = os.path.expandvars(os.path.expanduser(os.fspath(name)))
+                mimetype = _IMAGE_TYPES.get(os.path.splitext(filename)[1].lower())
+                if mimetype is None:
+                    mimetype, enc = mimetypes.guess_type(filename)
+                # The destination is always a device (POSIX) path.
+                remotepath = "{}/{}".format(destdir.rstrip("/"), os.path.basename(filename))
+                self._resolved[key] = (filename, remotepath, mimetype)
+            key = (filename, destdir)
+            mtime = os.stat(filename).st_mtime_ns
+            if self._pushed.get(key) != mtime:
+                topush.append(filename)
+                self._pushed[key] = mtime
+            result.append((remotepath, mimetype))
+        if topush:
+            try:
+                self._controller.adb.push(topush, destdir, sync=True)
+            except:  # noqa
+                for filename in topush:
+                    self._pushed.pop((filename, destdir), None)
+                raise
+        return result
+
+    def prepare(self, filename, destdir=None):
+        [(remotepath, mimetype)] = self.push_images([filename], destdir)
+        self._wake()
         return remotepath, mimetype
 
     def display(self, imagepath, destdir=None):
-        remotepath, mimetype = self.prepare(imagepath, destdir)
-        self._controller.buttons.back()  # undo previous display.
+        [(remotepath, mimetype)] = self.push_images([imagepath], destdir)
+        self._wake("KEYCODE_BACK")  # Also undo previous display.
         self._controller.start_activity(action='android.intent.action.VIEW',
                                         data="file://" + remotepath,
                                         mimetype=mimetype)
 
+    def _wake(self, *keycodes):
+        # Wake up the screen the same way as buttons.power(), pressing any
+        # other keys in the same adb shell call.
+        self._controller.buttons.press('KEYCODE_WAKEUP', *keycodes)
+
+
+def display_all(displayers, imagepath, destdir=None):
+    """Display an image on several displayers.
+
+    The displayers are driven one after another. All adb calls run on the one
+    process-wide curio kernel, which can't be used from several threads at once.
+    """
+    for displayer in displayers:
+        displayer.display(imagepath, destdir)
+
 
 if __name__ == "__main__":
     # Unit test case...
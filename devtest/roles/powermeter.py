@@ -15,6 +15,7 @@
 """The power measuring role.
 """
 
+from devtest import logging
 from devtest.core import constants
 from devtest.devices.monsoon import measure
 
@@ -27,13 +28,30 @@ class PowerMeterRole(BaseRole):
     This one uses Monsoon device.
     """
 
+    def initialize(self):
+        self._passthrough = {}
+        self._warned = False
+
+    def _no_meter(self):
+        # True, with a warning, when there is no Monsoon to sample from.
+        if not self._equipment.get("serno"):
+            if not self._warned:
+                logging.warning("PowerMeterRole: no serial number configured, "
+                                "not measuring.")
+                self._warned = True
+            return True
+        return False
+
     def measure_average_power(self, duration=10, samples=None, voltage=4.2,
                               passthrough="auto", delay=0):
         """Measure and report average power over the span of time.
 
         Returns:
-            devtest.devices.monsoon.core.MeasurementResult object.
+            devtest.devices.monsoon.core.MeasurementResult object, or None if
+            no power meter serial number is configured.
         """
+        if self._no_meter():
+            return None
         measure_context = {
             "serialno": self._equipment["serno"],
             "passthrough": passthrough,
@@ -51,8 +69,11 @@ class PowerMeterRole(BaseRole):
         """Record all samples to a file.
 
         Returns:
-            devtest.devices.monsoon.core.MeasurementResult object.
+            devtest.devices.monsoon.core.MeasurementResult object, or None if
+            no power meter serial number is configured.
         """
+        if self._no_meter():
+            return None
         measure_context = {
             "serialno": self._equipment["serno"],
             "passthrough": passthrough,
@@ -69,7 +90,14 @@ class PowerMeterRole(BaseRole):
     def get_passthrough_mode(self, equipment):
         """Inspect the equipment's connection type to determine the passthrough
         mode.
+
+        The connections do not change during a session, so the result is
+        remembered per equipment.
         """
+        try:
+            return self._passthrough[equipment]
+        except KeyError:
+            pass
         passthrough = None
         for conn in equipment.connections:
             if conn.type == constants.ConnectionType.USB2:
@@ -79,6 +107,7 @@ class PowerMeterRole(BaseRole):
             elif conn.type == constants.ConnectionType.Power:
                 passthrough = "auto"
                 break
+        self._passthrough[equipment] = passthrough
         return passthrough
 
 
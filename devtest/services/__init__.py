@@ -17,12 +17,11 @@ my request via the "service_want" signal.
 
 The service gets the equipment runtime object to inspect.
 
-Scans for potential services in this subpackage and initializes
-them.
+Initializes the service modules of this subpackage that are listed in
+`SERVICE_MODULES`. Add the module name there when adding a new service.
 """
 
 import abc
-import pkgutil
 
 from devtest import importlib
 from devtest import logging
@@ -31,27 +30,51 @@ from devtest.core import exceptions
 
 
 _manager = None
+_service_mods = None
+
+# Service modules in this subpackage, in initialization order.
+SERVICE_MODULES = (
+    "androidcpu",
+    "androidmemory",
+    "logcat",
+    "monsoon",
+    "serialcapture",
+)
 
 
 def log_receiver_connected(sig, receiver=None, sender=None, weak=None):
+    if not logging.enabled("INFO"):
+        return
     logging.info(
         "signal.connect: {name!r} receiver={recv!r} sender={sender!r}".format(
             name=sig.name, recv=receiver, sender=sender))
 
 
 def log_service_want(equipment, service=None, **kwargs):
+    if not logging.enabled("INFO"):
+        return
     logging.info("service wanted by {!r}: {!r} kwargs={!r}".format(equipment.name, service, kwargs))
 
 
 def log_service_dontwant(equipment, service=None, **kwargs):
+    if not logging.enabled("INFO"):
+        return
     logging.info("service no longer wanted by {!r}: {!r} kwargs={!r}".format(equipment.name, service, kwargs))
 
 
+# The log receivers stay connected for the life of the process, rather than
+# being connected and disconnected with each initialize and finalize.
+signals.service_want.connect(log_service_want)
+signals.service_dontwant.connect(log_service_dontwant)
+signals.receiver_connected.connect(log_receiver_connected)
+
+
 class Service(abc.ABC):
     """Base class for all services.
 
     Service class in submodules inherit from this class.
     """
+    __slots__ = ()
 
     def provide_for(self, needer, **kwargs):
         """Provide the service for the needer (equipment).
@@ -79,6 +102,7 @@ class ServiceManager:
     """
     def __init__(self):
         self._servicemap = {}
+        self._pending = None  # registrations held back by begin_batch
         signals.service_want.connect(self._fulfiller, weak=False)
         signals.service_dontwant.connect(self._releaser, weak=False)
 
@@ -89,28 +113,67 @@ class ServiceManager:
 
     def register(self, provider, name):
         self._servicemap[name] = provider
-        signals.service_provide.send(self, provider=provider, name=name)
+        if self._pending is not None:
+            self._pending.append((provider, name))
+        else:
+            signals.service_provide.send(self, provider=provider, name=name)
+
+    def register_many(self, items):
+        """Register several (provider, name) pairs.
+
+        All are registered before any service_provide signal is sent.
+        """
+        if self._pending is not None:  # Already batching, the caller ends it.
+            for provider, name in items:
+                self.register(provider, name)
+            return
+        self.begin_batch()
+        try:
+            for provider, name in items:
+                self.register(provider, name)
+        finally:
+            self.end_batch()
+
+    def begin_batch(self):
+        """Hold back service_provide signals until `end_batch`.
+
+        Services are still registered, and fetchable, immediately.
+        """
+        if self._pending is None:
+            self._pending = []
+
+    def end_batch(self):
+        """Send the service_provide signals held back since `begin_batch`.
+
+        The signals are the same as an unbatched register sends, one per
+        service.
+        """
+        pending, self._pending = self._pending, None
+        for provider, name in pending or ():
+            signals.service_provide.send(self, provider=provider, name=name)
 
     def unregister(self, name):
         return self._servicemap.pop(name, None)
 
     def fetch(self, name):
-        srv = self._servicemap.get(name)
-        if srv is None:
+        try:
+            return self._servicemap[name]
+        except KeyError:
             raise exceptions.ConfigError(
                 "Service {!r} is not registered.".format(name))
-        return srv
 
     def _fulfiller(self, needer, service=None, **kwargs):
-        srv = self._servicemap.get(service)
-        if srv is None:
+        try:
+            srv = self._servicemap[service]
+        except KeyError:
             raise exceptions.ConfigError(
                 "{} wants {!r} but is not provided.".format(needer, service))
         return srv.provide_for(needer, **kwargs)
 
     def _releaser(self, needer, service=None, **kwargs):
-        srv = self._servicemap.get(service)
-        if srv is None:
+        try:
+            srv = self._servicemap[service]
+        except KeyError:
             raise exceptions.ConfigError(
                 "Service {!r} for {} not needed yet does not exist.".format(service, needer))
         return srv.release_for(needer, **kwargs)
@@ -123,28 +186,37 @@ def get_manager():
     return _manager
 
 
+def preload(*modnames):
+    """Import modules, in this process, that a coprocess function will use.
+
+    Coprocesses are forked from this process, so they then inherit the
+    modules instead of importing them again on every start.
+    """
+    for name in modnames:
+        importlib.import_module(name)
+
+
 def _mod_finder():
-    for finder, name, ispkg in pkgutil.iter_modules(__path__,
-                                                    prefix=__name__ + "."):
-        if not ispkg:
-            mod = importlib.import_module(name)
-            yield mod
+    global _service_mods
+    if _service_mods is None:
+        _service_mods = [importlib.import_module(__name__ + "." + name)
+                         for name in SERVICE_MODULES]
+    return _service_mods
 
 
 def initialize():
-    signals.service_want.connect(log_service_want, weak=False)
-    signals.service_dontwant.connect(log_service_dontwant, weak=False)
-    signals.service_provide.receiver_connected.connect(log_receiver_connected)
     manager = get_manager()
-    for mod in _mod_finder():
-        mod.initialize(manager)
+    # Announce services after all modules have registered theirs.
+    manager.begin_batch()
+    try:
+        for mod in _mod_finder():
+            mod.initialize(manager)
+    finally:
+        manager.end_batch()
 
 
 def finalize():
-    global _manager
-    signals.service_want.disconnect(log_service_want)
-    signals.service_dontwant.disconnect(log_service_dontwant)
-    signals.service_provide.receiver_connected.disconnect(log_receiver_connected)
+    global _manager, _service_mods
     manager = get_manager()
     for mod in _mod_finder():
         try:
@@ -152,6 +224,7 @@ def finalize():
         # allows all service modules to finalize.
         except Exception as exc:
             logging.exception_error("Exception in finalizer for {}".format(mod), exc)
+    _service_mods = None
     manager.close()
     _manager = None
 
@@ -16,7 +16,7 @@
 """
 
 from devtest.os import process
-from . import Service
+from . import Service, preload
 
 
 class CPUMonitorService(Service):
@@ -32,6 +32,8 @@ class CPUMonitorService(Service):
             return False
         if (needer.serno, pid) in self._inuse:
             return True
+        preload("devtest.os.cpuinfo", "devtest.io.reactor",
+                "devtest.devices.android.adb")
         pm = process.get_manager()
         coproc = pm.coprocess()
         coproc.start(make_cpu_monitor, needer.serno, pid, interval)
@@ -57,47 +59,69 @@ class CPUMonitorService(Service):
             proc.wait()
 
 
+def _get_cpu_jiffies(stat):
+    """Return utime + stime from the text of /proc/<pid>/stat.
+
+    Only those two fields are parsed. The command name, which may contain
+    spaces, ends at the last ")". The fields after it start at field 3.
+    """
+    fields = stat[stat.rindex(b")") + 2:].split(None, 13)
+    return int(fields[11]) + int(fields[12])
+
+
 # Runs from coprocess server
 def make_cpu_monitor(serialno, pid, interval):
-    import io
     import signal
     from devtest.os import cpuinfo
     from devtest.io.reactor import sleep, spawn, SignalEvent
     from devtest.devices.android import adb
 
+    END = b"__DEVTEST_END__\n"  # echoed after each sample
+
     class LocalCPUMonitor:
 
         def __init__(self, adbclient, pid, interval):
             self._adb = adbclient
             self._pid = pid
-            self._path = "/proc/{pid:d}/stat".format(pid=pid)
+            # END includes the newline that ends the command line.
+            self._command = b"cat /proc/uptime /proc/%d/stat 2>/dev/null; echo %b" % (
+                pid, END)
+            self._shell = None
             self._interval = float(interval)
             self._start_jiffies = None
             self._starttime = None
 
-        async def get_timestamp(self):
-            with io.BytesIO() as bio:
-                await self._adb.pull_file("/proc/uptime", bio)
-                text = bio.getvalue()
+        async def open(self):
+            # One shell for the life of the monitor, instead of a sync
+            # transfer per file per sample.
+            self._shell = await self._adb.spawn("sh")
+
+        async def close(self):
+            if self._shell is not None:
+                await self._shell.close()
+                self._shell = None
+
+        async def get_sample(self):
+            """Read uptime and the process stat in one round trip."""
+            await self._shell.write(self._command)
+            text = await self._shell.read_until(END)
+            if text is None:
+                raise adb.Error("Monitor shell exited.")
+            uptime, _, stat = text.partition(b"\n")
+            if not stat:
+                raise adb.Error("Process {} is gone.".format(self._pid))
             # Wall clock since boot, combined idle time of all cpus
-            clock, _ = text.split()
-            return float(clock)
-
-        async def get_procstat(self):
-            with io.BytesIO() as bio:
-                await self._adb.pull_file(self._path, bio)
-                ps = cpuinfo.ProcStat.from_text(bio.getvalue())
-            return ps
+            clock, _ = uptime.split()
+            return float(clock), stat
 
         async def get_current(self):
-            now = await self.get_timestamp()
-            ps = await self.get_procstat()
-            current_jiffies = ps.stime + ps.utime
+            now, stat = await self.get_sample()
+            current_jiffies = _get_cpu_jiffies(stat)
             return now, float(current_jiffies - self._start_jiffies) / (now - self._starttime)
 
         async def run(self, accumulator):
-            self._starttime = await self.get_timestamp()
-            ps = await self.get_procstat()
+            self._starttime, stat = await self.get_sample()
+            ps = cpuinfo.ProcStat.from_text(stat)  # Full parse validates it once.
             self._start_jiffies = ps.stime + ps.utime
             while True:
                 await sleep(self._interval)
@@ -113,10 +137,12 @@ def make_cpu_monitor(serialno, pid, interval):
         try:
             signalset = SignalEvent(signal.SIGINT, signal.SIGTERM)
             try:
+                await cpumon.open()
                 task = await spawn(cpumon.run(cpudata))
                 await signalset.wait()
                 await task.cancel()
             finally:
+                await cpumon.close()
                 del cpumon
                 await aadc.close()
         except KeyboardInterrupt:
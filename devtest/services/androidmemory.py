@@ -16,7 +16,12 @@
 """
 
 from devtest.os import process
-from . import Service
+from . import Service, preload
+
+# Producing smaps is costly for the device kernel, so sample it sparingly.
+DEFAULT_INTERVAL = 60
+# Shorter intervals are raised to this, unless the "force_fast" option is set.
+SMAPS_MIN_INTERVAL = 10.0
 
 
 class MemoryMonitorService(Service):
@@ -27,11 +32,15 @@ class MemoryMonitorService(Service):
 
     def provide_for(self, needer, **kwargs):
         pid = kwargs.get("pid")
-        interval = kwargs.get("interval", 1)
+        interval = kwargs.get("interval", DEFAULT_INTERVAL)
+        if not kwargs.get("force_fast", False):
+            interval = max(interval, SMAPS_MIN_INTERVAL)
         if not pid:
             return False
         if (needer.serno, pid) in self._inuse:
             return True
+        preload("devtest.os.meminfo", "devtest.io.reactor",
+                "devtest.devices.android.adb")
         pm = process.get_manager()
         coproc = pm.coprocess()
         coproc.start(make_memory_monitor, needer.serno, pid, interval)
@@ -59,24 +68,49 @@ class MemoryMonitorService(Service):
 
 # Runs from coprocess server
 def make_memory_monitor(serialno, pid, interval):
-    import io
     import signal
     from datetime import datetime, timezone
     from devtest.os import meminfo
     from devtest.io.reactor import sleep, spawn, SignalEvent
     from devtest.devices.android import adb
 
+    END = b"__DEVTEST_END__\n"  # echoed after each sample
+
     class LocalMemoryMonitor:
 
         def __init__(self, adbclient, pid, interval):
             self._adb = adbclient
             self._path = meminfo.Maps.SMAPS.format(pid=pid)
+            self._command = None
+            self._shell = None
             self._interval = float(interval)
 
+        async def open(self):
+            # One shell for the life of the monitor, instead of a sync
+            # transfer per sample.
+            self._shell = await self._adb.spawn("sh")
+            # Kernels that have smaps_rollup sum the mappings themselves.
+            rollup = self._path + "_rollup"
+            await self._shell.write(b"test -r %b && echo yes; echo %b" % (
+                rollup.encode("ascii"), END))
+            if await self._shell.read_until(END) == b"yes\n":
+                self._path = rollup
+            # END includes the newline that ends the command line.
+            self._command = b"cat %b 2>/dev/null; echo %b" % (
+                self._path.encode("ascii"), END)
+
+        async def close(self):
+            if self._shell is not None:
+                await self._shell.close()
+                self._shell = None
+
         async def get_current(self):
-            with io.BytesIO() as bio:
-                await self._adb.pull_file(self._path, bio)
-                text = bio.getvalue()
+            await self._shell.write(self._command)
+            text = await self._shell.read_until(END)
+            if text is None:
+                raise adb.Error("Monitor shell exited.")
+            if not text:
+                raise adb.Error("Could not read {}.".format(self._path))
             return meminfo.Maps.from_text(text)
 
         async def run(self, accumulator):
@@ -94,10 +128,12 @@ def make_memory_monitor(serialno, pid, interval):
         try:
             signalset = SignalEvent(signal.SIGINT, signal.SIGTERM)
             try:
+                await mm.open()
                 task = await spawn(mm.run(memdata))
                 await signalset.wait()
                 await task.cancel()
             finally:
+                await mm.close()
                 del mm
                 await aadc.close()
         except KeyboardInterrupt:
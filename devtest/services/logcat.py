@@ -21,7 +21,9 @@ Will write a logcat capture file to the logdir_location.
 from devtest import logging
 from devtest.qa import signals
 from devtest.os import process
-from . import Service
+from . import Service, preload
+
+LOGFILE_BUFSIZE = 65536
 
 
 class LogcatService(Service):
@@ -37,6 +39,7 @@ class LogcatService(Service):
 
     def provide_for(self, needer, **kwargs):
         logtags = kwargs.get("logcat_tags", getattr(needer, "logcat_tags", ""))
+        preload("devtest.io.reactor", "devtest.devices.android.adb")
         pm = process.get_manager()
         coproc = pm.coprocess()
         coproc.start(make_logcat_coroutine, needer.serno, self._logdir, logtags)
@@ -56,6 +59,7 @@ class LogcatService(Service):
 def make_logcat_coroutine(serialno, logdir, logtags):
     import os
     import signal
+    import subprocess
     from devtest.io.reactor import spawn, SignalEvent
     from devtest.devices.android import adb
 
@@ -68,11 +72,27 @@ def make_logcat_coroutine(serialno, logdir, logtags):
         try:
             signalset = SignalEvent(signal.SIGINT, signal.SIGTERM)
             try:
-                with open(logfilename, "ab", 0) as logfile:
-                    task = await spawn(aadc.logcat(logfile, logfile,
-                                                   logtags=logtags))
-                    await signalset.wait()
-                    await task.cancel()
+                # Buffered, so each shell packet is not its own write. The
+                # file is flushed when closed after the signal.
+                with open(logfilename, "ab", LOGFILE_BUFSIZE) as logfile:
+                    if adb.ADB:
+                        # The adb client writes to the file itself, so the
+                        # log does not pass through this process.
+                        tags = os.environ.get("ANDROID_LOG_TAGS", logtags)
+                        cmd = [adb.ADB, "-s", serialno, "exec-out", "logcat",
+                               "-v", "threadtime"] + tags.split()
+                        proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL,
+                                                stdout=logfile, stderr=logfile)
+                        try:
+                            await signalset.wait()
+                        finally:
+                            proc.terminate()
+                            proc.wait()
+                    else:
+                        task = await spawn(aadc.logcat(logfile, logfile,
+                                                       logtags=logtags))
+                        await signalset.wait()
+                        await task.cancel()
             finally:
                 await aadc.close()
         except KeyboardInterrupt:
@@ -26,7 +26,7 @@ from devtest import logging
 from devtest.core import constants
 from devtest.core import exceptions
 from devtest.os import process
-from . import Service
+from . import Service, preload
 
 
 class MonsoonService(Service):
@@ -37,7 +37,8 @@ class MonsoonService(Service):
 
     def __init__(self):
         super().__init__()
-        self._used = {}
+        self._used = {}  # HVPM serial number -> coprocess
+        self._serials = {}  # needer -> HVPM serial number it was given
 
     def _find_hvpm(self, needer):
         # The equipment model should have a device with a connected HVPM,
@@ -73,18 +74,21 @@ class MonsoonService(Service):
             "voltage": needer.get("voltage", 4.2),
         }
         ctx.update(kwargs)
+        preload("devtest.devices.monsoon.measure", "devtest.devices.monsoon.simple")
         pm = process.get_manager()
         logging.info("Providing {} for {}".format(hvpm, needer))
         coproc = pm.coprocess()
         coproc.start(domeasure, ctx)
         self._used[hvpm.serno] = coproc
+        self._serials[needer] = hvpm.serno
 
     def release_for(self, needer, **kwargs):
-        hvpm, _ = self._find_hvpm(needer)
+        # Use the HVPM found when provided, rather than scanning connections again.
+        serno = self._serials.pop(needer, None)
         result = None
-        if hvpm is not None:
-            logging.info("Releasing {} for {}".format(hvpm, needer))
-            coproc = self._used.pop(hvpm.serno, None)
+        if serno is not None:
+            logging.info("Releasing HVPM {} for {}".format(serno, needer))
+            coproc = self._used.pop(serno, None)
             if coproc is not None:
                 logging.info("Interrupting Monsoon")
                 coproc.interrupt()
@@ -92,6 +96,7 @@ class MonsoonService(Service):
         return result
 
     def close(self):
+        self._serials.clear()
         while self._used:
             serno, coproc = self._used.popitem()
             try:
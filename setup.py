@@ -72,7 +72,6 @@ setup(
     description='General purpose device and system test framework.',
     long_description=open('README.md').read(),
     install_requires=[
-        'blinker',
         'cryptography',
         'curio',
         'docopt',
@@ -0,0 +1,80 @@
+"""
+Unit tests for devtest.os.meminfo module.
+"""
+
+from devtest.os import meminfo
+
+
+# smaps_rollup from a 5.10 kernel, which added the Pss_Anon, Pss_File and
+# Pss_Shmem lines.
+ROLLUP_5_10 = b"""\
+5f6b1c9a0000-7ffd4f1fd000 ---p 00000000 00:00 0                          [rollup]
+Rss:                8436 kB
+Pss:                3183 kB
+Pss_Anon:            876 kB
+Pss_File:           2307 kB
+Pss_Shmem:             0 kB
+Shared_Clean:       6152 kB
+Shared_Dirty:          0 kB
+Private_Clean:      1408 kB
+Private_Dirty:       876 kB
+Referenced:         8436 kB
+Anonymous:           876 kB
+LazyFree:              0 kB
+AnonHugePages:         0 kB
+ShmemPmdMapped:        0 kB
+FilePmdMapped:         0 kB
+Shared_Hugetlb:        0 kB
+Private_Hugetlb:       0 kB
+Swap:                  0 kB
+SwapPss:               0 kB
+Locked:                0 kB
+"""
+
+# smaps_rollup from a 6.x kernel, which also has Pss_Dirty and KSM.
+ROLLUP_6 = b"""\
+55b007392000-7ffe91b71000 ---p 00000000 00:00 0                          [rollup]
+Rss:                1404 kB
+Pss:                 465 kB
+Pss_Dirty:           104 kB
+Pss_Anon:            104 kB
+Pss_File:            361 kB
+Pss_Shmem:             0 kB
+Shared_Clean:       1260 kB
+Shared_Dirty:          0 kB
+Private_Clean:        40 kB
+Private_Dirty:       104 kB
+Referenced:         1404 kB
+Anonymous:           104 kB
+KSM:                   0 kB
+LazyFree:              0 kB
+AnonHugePages:         0 kB
+ShmemPmdMapped:        0 kB
+FilePmdMapped:         0 kB
+Shared_Hugetlb:        0 kB
+Private_Hugetlb:       0 kB
+Swap:                  0 kB
+SwapPss:               0 kB
+Locked:                0 kB
+"""
+
+
+class TestMaps:
+
+    def test_rollup_5_10(self):
+        maps = meminfo.Maps.from_text(ROLLUP_5_10)
+        assert len(maps) == 1
+        usage = maps.rollup()
+        assert usage.Rss == 8436 * 1024
+        assert usage.Pss == 3183 * 1024
+        assert usage.Uss == (1408 + 876) * 1024
+
+    def test_rollup_6(self):
+        maps = meminfo.Maps.from_text(ROLLUP_6)
+        assert len(maps) == 1
+        assert maps[0].name == "[rollup]"
+        usage = maps.rollup()
+        assert usage.Pss == 465 * 1024
+        assert usage.Uss == (40 + 104) * 1024
+
+# vim:ts=4:sw=4:softtabstop=4:smarttab:expandtab
@@ -0,0 +1,77 @@
+"""
+Unit tests for devtest.qa.signals module.
+"""
+
+import gc
+
+from devtest.qa import signals
+
+
+class Receiver:
+
+    def __init__(self):
+        self.calls = []
+
+    def on_signal(self, sender, **kwargs):
+        self.calls.append((sender, kwargs))
+        return len(self.calls)
+
+
+class Sender:
+    pass
+
+
+class TestSignal:
+
+    def test_send_and_disconnect(self):
+        sig = signals.Signal("test")
+        recv = Receiver()
+        sig.connect(recv.on_signal)
+        assert sig.send(None, message="hi") == [(recv.on_signal, 1)]
+        sig.disconnect(recv.on_signal)
+        assert sig.send(None, message="again") == []
+        assert recv.calls == [(None, {"message": "hi"})]
+
+    def test_weak_receiver_removed(self):
+        sig = signals.Signal("test")
+        recv = Receiver()
+        sig.connect(recv.on_signal)
+        del recv
+        gc.collect()
+        assert sig.send(None) == []
+        assert sig._entries == {signals._ANY_ID: ()}
+
+    def test_strong_receiver_kept(self):
+        sig = signals.Signal("test")
+        calls = []
+        sig.connect(lambda sender: calls.append(sender), weak=False)
+        gc.collect()
+        sig.send("me")
+        assert calls == ["me"]
+
+    def test_sender_specific(self):
+        sig = signals.Signal("test")
+        one, other = Sender(), Sender()
+        recv = Receiver()
+        sig.connect(recv.on_signal, sender=one)
+        sig.send(other)
+        sig.send(one)
+        assert recv.calls == [(one, {})]
+        recv.calls.clear()
+        del one
+        gc.collect()
+        assert list(sig._entries) == [signals._ANY_ID]
+
+    def test_receiver_connected(self):
+        sig = signals.Signal("test")
+        calls = []
+
+        def on_connect(signal, **kwargs):
+            calls.append((signal, kwargs))
+
+        signals.receiver_connected.connect(on_connect, weak=False)
+        try:
+            sig.connect(print, weak=False)
+        finally:
+            signals.receiver_connected.disconnect(on_connect)
+        assert calls[-1] == (sig, {"receiver": print, "sender": signals.ANY, "weak": False})
@@ -0,0 +1,50 @@
+"""
+Unit tests for devtest.qa.reports module.
+"""
+
+from devtest import json
+from devtest.qa import reports
+
+
+class TestDataWriter:
+
+    def test_single_write(self, tmp_path):
+        fpath = str(tmp_path / "t_data.json")
+        dw = reports.DataWriter()
+        added = []
+        dw.write(fpath, {"a": 1}, added.append)
+        dw.close()
+        assert json.from_file(fpath) == {"a": 1}
+        assert added == [False]
+
+    def test_repeated_writes_make_list(self, tmp_path):
+        fpath = str(tmp_path / "t_data.json")
+        dw = reports.DataWriter()
+        added = []
+        dw.write(fpath, {"a": 1}, added.append)
+        dw.write(fpath, {"b": 2}, added.append)
+        dw.write(fpath, {"c": 3})
+        dw.close()
+        assert json.from_file(fpath) == [{"a": 1}, {"b": 2}, {"c": 3}]
+        assert added == [False, True]
+
+    def test_appends_to_existing_file(self, tmp_path):
+        fpath = str(tmp_path / "t_data.json")
+        with open(fpath, "w") as fo:
+            fo.write(json.dumps([1, 2]))
+        dw = reports.DataWriter()
+        added = []
+        dw.write(fpath, 3, added.append)
+        dw.close()
+        assert json.from_file(fpath) == [1, 2, 3]
+        assert added == [True]
+
+    def test_shared_writer_flush(self, tmp_path):
+        assert reports.get_data_writer() is reports.get_data_writer()
+        fpath = str(tmp_path / "t_data.json")
+        for n in range(10):
+            reports.get_data_writer().write(fpath, n)
+        reports.get_data_writer().flush()
+        assert json.from_file(fpath) == list(range(10))
+
+# vim:ts=4:sw=4:softtabstop=4:smarttab:expandtab
@@ -0,0 +1,37 @@
+"""
+Unit tests for devtest.qa.runner module.
+"""
+
+from devtest.core import constants
+from devtest.qa import runner
+
+Result = constants.TestResult
+
+
+class TestAggregateResults:
+
+    def test_enum_results(self):
+        aggregate = runner._aggregate_returned_results
+        assert aggregate([Result.PASSED, Result.FAILED]) is Result.FAILED
+        assert aggregate([Result.PASSED, Result.INCOMPLETE]) is Result.INCOMPLETE
+        assert aggregate([Result.PASSED, None]) is Result.NA
+        assert aggregate([Result.PASSED]) is Result.PASSED
+        assert aggregate([]) is Result.INCOMPLETE
+
+    def test_int_results(self):
+        aggregate = runner._aggregate_returned_results
+        assert aggregate([1, 0]) is Result.FAILED
+        assert aggregate([0]) is Result.PASSED
+        assert aggregate([0, 2]) is Result.INCOMPLETE
+
+    def test_bool_results(self):
+        aggregate = runner._aggregate_returned_results
+        assert aggregate([False]) is Result.PASSED
+        assert aggregate([False, True]) is Result.FAILED
+
+    def test_uncounted_results(self):
+        aggregate = runner._aggregate_returned_results
+        assert aggregate([Result.SKIPPED, Result.PASSED]) is Result.PASSED
+        assert aggregate([Result.ABORTED]) is Result.INCOMPLETE
+
+# vim:ts=4:sw=4:softtabstop=4:smarttab:expandtab
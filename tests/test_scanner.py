@@ -0,0 +1,166 @@
+"""
+Unit tests for devtest.qa.scanner module.
+"""
+
+import os
+import re
+import types
+
+from devtest.qa import scanner
+from devtest.qa import bases
+
+
+def _filter(include=None, exclude=None):
+    return scanner._NameFilter(scanner._get_patterns(include, "include"),
+                               scanner._get_patterns(exclude, "exclude"))
+
+
+class TestNameFilter:
+
+    def test_no_patterns(self):
+        assert _filter().search("testcases.foo")
+
+    def test_include_exclude(self):
+        nf = _filter(include="foo", exclude="analyze")
+        assert nf.search("testcases.foo")
+        assert not nf.search("testcases.bar")
+        assert not nf.search("testcases.foo_analyze")
+
+    def test_pattern_lists(self):
+        nf = _filter(include=["foo", re.compile("bar")], exclude=["skip"])
+        assert nf.search("testcases.bar")
+        assert nf.search("testcases.foo")
+        assert not nf.search("testcases.skip.foo")
+
+    def test_flags_preserved(self):
+        nf = _filter(exclude=re.compile("ANALYZE", re.I))
+        assert not nf.search("testcases.analyze")
+        assert nf.search("testcases.foo")
+
+    def test_inline_flags(self):
+        nf = _filter(include=["bar", "(?i)FOO"], exclude="(?i)SKIP")
+        assert nf.search("testcases.foo")
+        assert nf.search("testcases.bar")
+        assert not nf.search("testcases.baz")
+        assert not nf.search("testcases.foo_skip")
+
+    def test_backreferences(self):
+        nf = _filter(include=["x", r"(a)\1"], exclude=[r"(b)\1", "z"])
+        assert nf.search("testcases.aa")
+        assert not nf.search("testcases.ab")
+        assert not nf.search("testcases.aabb")
+        assert not nf.search("testcases.aaz")
+
+    def test_key_includes_flags(self):
+        assert (_filter(include=re.compile("foo")).key !=
+                _filter(include=re.compile("foo", re.I)).key)
+
+    def test_private_names(self):
+        assert not _filter().search("testcases._foo")
+        assert not _filter(include="foo").search("testcases._private.foo")
+        assert not _filter(exclude=re.compile("X", re.I)).search("testcases._foo")
+
+
+class TestWalkSpecs:
+
+    def test_matches_walk_packages(self, tmp_path, monkeypatch):
+        pkgdir = tmp_path / "scanpkg"
+        (pkgdir / "sub").mkdir(parents=True)
+        (pkgdir / "nopkg").mkdir()
+        for name in ("__init__.py", "b.py", "a.py", "_private.py", "sub/__init__.py",
+                     "sub/c.py", "nopkg/d.py", "notes.txt"):
+            (pkgdir / name).write_text("")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        names = [spec.name for spec in scanner.iter_module_specs("scanpkg")]
+        assert names == ["scanpkg.a", "scanpkg.b", "scanpkg.sub.c"]
+
+    def test_new_module_in_empty_subpackage(self, tmp_path, monkeypatch):
+        pkgdir = tmp_path / "scanpkg2"
+        (pkgdir / "sub").mkdir(parents=True)
+        for name in ("__init__.py", "a.py", "sub/__init__.py"):
+            (pkgdir / name).write_text("")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        names = [spec.name for spec in scanner.iter_module_specs("scanpkg2")]
+        assert names == ["scanpkg2.a"]
+        (pkgdir / "sub" / "b.py").write_text("")
+        os.utime(str(pkgdir / "sub"), ns=(0, 1))  # Filesystem times may be coarse.
+        names = [spec.name for spec in scanner.iter_module_specs("scanpkg2")]
+        assert names == ["scanpkg2.a", "scanpkg2.sub.b"]
+
+
+class TestModules:
+
+    def test_main_thread_only_module(self, tmp_path, monkeypatch):
+        pkgdir = tmp_path / "sigpkg"
+        pkgdir.mkdir()
+        (pkgdir / "__init__.py").write_text("")
+        (pkgdir / "plain.py").write_text("")
+        (pkgdir / "handler.py").write_text(
+            "import signal\n\n"
+            "signal.signal(signal.SIGUSR1, signal.getsignal(signal.SIGUSR1))\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.setattr(scanner, "IMPORT_THREADS", 4)
+        names = sorted(mod.__name__ for mod in scanner.iter_modules("sigpkg"))
+        assert names == ["sigpkg.handler", "sigpkg.plain"]
+
+
+class TestModuleClasses:
+
+    def test_cache_invalidated_by_new_names(self):
+        mod = types.ModuleType("scanmod")
+
+        class First(bases.TestCase):
+            pass
+
+        mod.First = First
+        assert list(scanner.iter_module_classes(mod, bases.TestCase)) == [First]
+        assert list(scanner.iter_module_classes(mod, bases.TestCase)) == [First]
+
+        class Second(bases.TestCase):
+            pass
+
+        mod.Second = Second
+        assert list(scanner.iter_module_classes(mod, bases.TestCase)) == [First, Second]
+        found = scanner.iter_module_classes(mod, (bases.TestSuite, bases.TestCase))
+        assert list(found) == [First, Second]
+
+
+class TestRunnableNames:
+
+    def test_names_cached(self, tmp_path, monkeypatch):
+        pkgdir = tmp_path / "namespkg"
+        pkgdir.mkdir()
+        (pkgdir / "__init__.py").write_text("")
+        (pkgdir / "mod.py").write_text(
+            "from devtest.qa import bases\n\n"
+            "class MyTest(bases.TestCase):\n    pass\n\n"
+            "def run(config, testbed, ui):\n    pass\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.setattr(scanner, "RUNNABLES_CACHE", str(tmp_path / "cache.json"))
+        expected = [(scanner.KIND_MODULE, "namespkg.mod"),
+                    (scanner.KIND_TEST, "namespkg.mod.MyTest")]
+        assert list(scanner.iter_runnable_names("namespkg")) == expected
+        # Second time is from the cache, without scanning modules.
+        monkeypatch.setattr(scanner, "iter_all_runnables", None)
+        assert list(scanner.iter_runnable_names("namespkg")) == expected
+        assert all(type(kind) is scanner.Kind
+                   for kind, name in scanner.iter_runnable_names("namespkg"))
+
+    def test_cached_per_filter(self, tmp_path, monkeypatch):
+        pkgdir = tmp_path / "filterpkg"
+        pkgdir.mkdir()
+        (pkgdir / "__init__.py").write_text("")
+        for name in ("one", "two"):
+            (pkgdir / (name + ".py")).write_text(
+                "from devtest.qa import bases\n\n"
+                "class MyTest(bases.TestCase):\n    pass\n")
+        monkeypatch.syspath_prepend(str(tmp_path))
+        monkeypatch.setattr(scanner, "RUNNABLES_CACHE", str(tmp_path / "cache.json"))
+        everything = list(scanner.iter_runnable_names("filterpkg"))
+        onlyone = list(scanner.iter_runnable_names("filterpkg", include="one"))
+        assert onlyone == [(scanner.KIND_TEST, "filterpkg.one.MyTest")]
+        assert len(everything) == 2
+        # Both scans are kept, and come from the cache.
+        monkeypatch.setattr(scanner, "iter_all_runnables", None)
+        assert list(scanner.iter_runnable_names("filterpkg")) == everything
+        assert list(scanner.iter_runnable_names("filterpkg", include="one")) == onlyone